@@ -0,0 +1,209 @@
+"""
+Tablas que alimentan los gráficos y las opciones de filtros de Inicio.
+
+Todo se calcula a partir del cubo de agregados (``data_loader.construir_cubo``) o del
+dataset limpio, sin Streamlit ni Plotly, para poder precalcularlo fuera de la app
+(``python -m data_loader build``) y guardarlo junto al dataset. ``graficos.py`` solo
+dibuja estas tablas.
+
+Cada función ``agregado_*`` devuelve None cuando el gráfico no aplica (faltan
+columnas o no hay datos) y un DataFrame, posiblemente vacío, en otro caso.
+
+Los filtros globales de Inicio (región, sector, categoría Basura Cero) se aplican
+al cubo antes de agregar. Como en un *crossfilter*, cada gráfico ignora el filtro
+de su propia dimensión (``FILTRO_PROPIO``): el de sectores sigue mostrando todos
+los sectores para comparar, y cambiar ese filtro no lo recalcula.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (
+    CATEGORIAS_BASURA_CERO,
+    COLUMNA_CODIGO_BC,
+    COORDENADAS_DEPARTAMENTOS,
+    clave_departamento,
+    conteo_categorias,
+)
+
+OpcionesFiltros = Tuple[List[str], List[str], List[str]]
+
+
+class Filtros(NamedTuple):
+    """Selección de los filtros globales (vacío = sin filtrar esa dimensión)."""
+
+    regiones: Tuple[str, ...] = ()
+    sectores: Tuple[str, ...] = ()
+    categorias: Tuple[str, ...] = ()
+
+
+def agregado_mapa(cubo: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Total, alineados con Basura Cero, porcentaje y coordenadas por departamento."""
+    if cubo.empty or not {"DEPARTAMENTO", COLUMNA_CODIGO_BC}.issubset(cubo.columns):
+        return None
+
+    # Un groupby sobre tres columnas (sin copiar el cubo) y un join de coordenadas.
+    totales = cubo["TOTAL"].to_numpy()
+    resumen = (
+        pd.DataFrame(
+            {
+                "DEPARTAMENTO": cubo["DEPARTAMENTO"].array,
+                "TOTAL": totales,
+                "ALINEADOS": np.where(cubo[COLUMNA_CODIGO_BC].to_numpy() > 0, totales, 0).astype(totales.dtype),
+            }
+        )
+        .groupby("DEPARTAMENTO", observed=True)
+        .sum()
+        .reset_index()
+    )
+    if resumen.empty:
+        return None
+
+    resumen["ALINEADOS"] = resumen["ALINEADOS"].astype(int)
+    resumen["PORCENTAJE"] = (resumen["ALINEADOS"] / resumen["TOTAL"] * 100).round(1)
+    # Los departamentos sin coordenadas conocidas quedan fuera (inner join).
+    resumen = (
+        resumen.assign(CLAVE_DEPARTAMENTO=clave_departamento(resumen["DEPARTAMENTO"]))
+        .join(COORDENADAS_DEPARTAMENTOS, on="CLAVE_DEPARTAMENTO", how="inner")
+        .drop(columns="CLAVE_DEPARTAMENTO")
+        .reset_index(drop=True)
+    )
+    if resumen.empty:
+        return None
+    return resumen
+
+
+def agregado_top_sectores(cubo: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Los 10 sectores con más negocios, de mayor a menor."""
+    if cubo.empty or "SECTOR" not in cubo.columns or cubo["SECTOR"].isna().all():
+        return None
+    return (
+        cubo.groupby("SECTOR", observed=True)["TOTAL"]
+        .sum()
+        .sort_values(ascending=False, kind="stable")
+        .head(10)
+        .reset_index(name="Total")
+    )
+
+
+def agregado_tendencia(cubo: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Número de registros por año."""
+    if "AÑO" not in cubo.columns:
+        return None
+    return cubo.dropna(subset=["AÑO"]).groupby("AÑO")["TOTAL"].sum().reset_index(name="Total")
+
+
+def agregado_relacion(cubo: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Iniciativas alineadas con Basura Cero frente a las que no tienen relación."""
+    if cubo.empty or COLUMNA_CODIGO_BC not in cubo.columns:
+        return None
+    totales = cubo["TOTAL"].to_numpy()
+    alineadas = int(totales[cubo[COLUMNA_CODIGO_BC].to_numpy() > 0].sum())
+    return (
+        pd.Series({"Iniciativas alineadas": alineadas, "Sin relación identificada": int(totales.sum()) - alineadas})
+        .loc[lambda serie: serie > 0]
+        .sort_values(ascending=False)
+        .rename_axis("Relación")
+        .reset_index(name="Total")
+    )
+
+
+def agregado_categorias(cubo: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Iniciativas por categoría Basura Cero, de mayor a menor."""
+    if cubo.empty or COLUMNA_CODIGO_BC not in cubo.columns:
+        return None
+    return (
+        conteo_categorias(cubo[COLUMNA_CODIGO_BC].to_numpy(), cubo["TOTAL"].to_numpy())
+        .sort_values(ascending=False)
+        .rename_axis("Categoría")
+        .reset_index(name="Total")
+    )
+
+
+def agregado_autoridades(cubo: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Las 15 autoridades ambientales con más registros (orden ascendente, para barras)."""
+    if cubo.empty or "AUTORIDAD AMBIENTAL" not in cubo.columns:
+        return None
+
+    # Se suma por valor (sin descartar nulos) y se normaliza solo el índice resultante.
+    conteo = cubo.groupby("AUTORIDAD AMBIENTAL", observed=True, dropna=False)["TOTAL"].sum()
+    conteo.index = (
+        pd.Series(conteo.index, dtype=object).fillna("No registra").astype(str).str.strip().replace("", "No registra")
+    )
+    return (
+        conteo.groupby(level=0)
+        .sum()
+        .loc[lambda serie: serie > 0]
+        .sort_values(ascending=False, kind="stable")
+        .head(15)
+        .rename_axis("AUTORIDAD AMBIENTAL")
+        .reset_index(name="Total")
+        .sort_values("Total")
+    )
+
+
+# Nombre del agregado -> función que lo calcula desde el cubo.
+AGREGADOS: Dict[str, Callable[[pd.DataFrame], Optional[pd.DataFrame]]] = {
+    "mapa": agregado_mapa,
+    "top_sectores": agregado_top_sectores,
+    "tendencia": agregado_tendencia,
+    "relacion": agregado_relacion,
+    "categorias": agregado_categorias,
+    "autoridades": agregado_autoridades,
+}
+
+
+# Agregado -> filtro de su propia dimensión, que no se le aplica.
+FILTRO_PROPIO: Dict[str, str] = {
+    "top_sectores": "sectores",
+    "relacion": "categorias",
+    "categorias": "categorias",
+}
+
+
+def filtros_aplicables(nombre: str, filtros: Filtros) -> Filtros:
+    """Los filtros que afectan al agregado ``nombre`` (sin el de su propia dimensión)."""
+    propio = FILTRO_PROPIO.get(nombre)
+    return filtros._replace(**{propio: ()}) if propio else filtros
+
+
+def calcular_agregados(cubo: pd.DataFrame) -> Dict[str, Optional[pd.DataFrame]]:
+    """Todos los agregados de ``AGREGADOS`` sobre el mismo cubo."""
+    return {nombre: funcion(cubo) for nombre, funcion in AGREGADOS.items()}
+
+
+def opciones_filtros(df: pd.DataFrame) -> OpcionesFiltros:
+    """Lista de opciones únicas para filtros (región, sector, categorías Basura Cero)."""
+    if "REGIÓN" in df.columns:
+        regiones = sorted(
+            region
+            for region in df["REGIÓN"].dropna().unique().tolist()
+            if str(region).strip()
+        )
+    else:
+        regiones = []
+
+    if "SECTOR" in df.columns:
+        sectores = sorted(
+            sector
+            for sector in df["SECTOR"].dropna().unique().tolist()
+            if str(sector).strip()
+        )
+    else:
+        sectores = []
+
+    if COLUMNA_CODIGO_BC in df.columns:
+        presentes = int(np.bitwise_or.reduce(df[COLUMNA_CODIGO_BC].to_numpy(), initial=0))
+        categorias_relacion = sorted(
+            categoria
+            for bit, categoria in enumerate(CATEGORIAS_BASURA_CERO)
+            if presentes >> bit & 1
+        )
+    else:
+        categorias_relacion = []
+
+    return regiones, sectores, categorias_relacion
@@ -0,0 +1,100 @@
+"""
+Tiempo hasta el primer render de cada sección en un proceso recién iniciado.
+
+Cada medición corre en un subproceso nuevo (sin módulos importados ni cachés de
+Streamlit), abre la app con ``AppTest`` directamente en la sección y mide la primera
+ejecución del script. La instantánea del dataset se prepara antes, así que el tiempo
+incluye leerla pero no descargar ni limpiar el CSV.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_arranque ruta/al/archivo.csv --repeticiones 3
+    python -m benchmarks.bench_arranque ruta/al/archivo.csv --repo otra/copia/del/proyecto
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+SECCIONES = (
+    "Inicio",
+    "Mapa del sitio",
+    "Preguntas frecuentes",
+    "Insights",
+    "Basura Cero",
+    "Historias Reales",
+)
+MODULOS_PESADOS = ("pandas", "plotly.express", "pyarrow")
+
+
+def _medir_seccion(repo: str, seccion: str) -> Dict[str, object]:
+    """Primer render de ``seccion`` en este proceso (se llama en un subproceso)."""
+    import logging
+
+    from streamlit.testing.v1 import AppTest
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    os.chdir(repo)
+    sys.path.insert(0, repo)
+    at = AppTest.from_file("main.py", default_timeout=600)
+    at.session_state["seccion"] = seccion
+    inicio = time.perf_counter()
+    at.run()
+    ms = (time.perf_counter() - inicio) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return {"ms": ms, "importados": [m for m in MODULOS_PESADOS if m in sys.modules]}
+
+
+def _subproceso(repo: str, seccion: str, entorno: Dict[str, str]) -> Dict[str, object]:
+    salida = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_arranque", "--repo", repo, "--seccion", seccion],
+        capture_output=True, text=True, check=True, env=entorno,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("csv", nargs="?", help="CSV con la forma del listado de Negocios Verdes")
+    parser.add_argument("--repo", default=".", help="Copia del proyecto a medir")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--seccion", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    repo = str(Path(args.repo).resolve())
+
+    if args.seccion:
+        print(json.dumps(_medir_seccion(repo, args.seccion)))
+        return
+    if not args.csv:
+        parser.error("falta el CSV")
+
+    with tempfile.TemporaryDirectory() as snapshot:
+        entorno = dict(
+            os.environ,
+            DASHBOARD_DATA_PATH=str(Path(args.csv).resolve()),
+            DASHBOARD_SNAPSHOT_DIR=snapshot,
+        )
+        _subproceso(repo, "Inicio", entorno)  # crea la instantánea y los derivados de imágenes
+
+        print(f"{'Sección':<22}{'mediana (ms)':>14}  módulos pesados importados")
+        for seccion in SECCIONES:
+            medidas: List[Dict[str, object]] = [
+                _subproceso(repo, seccion, entorno) for _ in range(args.repeticiones)
+            ]
+            tiempos = sorted(m["ms"] for m in medidas)
+            mediana = tiempos[len(tiempos) // 2]
+            print(f"{seccion:<22}{mediana:>14.0f}  {', '.join(medidas[-1]['importados']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
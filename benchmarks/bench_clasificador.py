@@ -0,0 +1,46 @@
+"""
+Compara el clasificador Basura Cero fila a fila con la versión vectorizada.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_clasificador --filas 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.sintetico import generar_textos
+from data_loader import codigos_basura_cero, etiquetas_basura_cero, tipo_relacion_basura_cero
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    df = generar_textos(args.filas, args.semilla)
+
+    inicio = time.perf_counter()
+    fila_a_fila = df.apply(tipo_relacion_basura_cero, axis=1)
+    t_fila = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vectorizado = etiquetas_basura_cero(codigos_basura_cero(df))
+    t_vector = time.perf_counter() - inicio
+
+    pd.testing.assert_series_equal(
+        fila_a_fila.reset_index(drop=True), vectorizado.reset_index(drop=True), check_names=False
+    )
+    print(f"Filas:         {args.filas:,}")
+    print(f"Fila a fila:   {t_fila:8.3f} s")
+    print(f"Vectorizado:   {t_vector:8.3f} s  (x{t_fila / t_vector:.1f})")
+    print("Resultados idénticos ✔")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Procesamiento incremental frente a la limpieza completa del listado.
+
+Sobre un listado sintético arma la versión "anterior" y le aplica varios cambios
+(filas agregadas, modificadas, eliminadas y una mezcla con duplicados y otro orden).
+Para cada uno mide ``procesar_contenido`` completo y con ``anterior``, y comprueba que
+el dataset (byte a byte en Feather), el cubo y los agregados de los gráficos son
+idénticos. Al final verifica que una instantánea con tablas de dos escrituras
+distintas no se reutiliza.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_incremental --tamano 100k
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.medicion import bytes_feather
+from benchmarks.sintetico import TAMANOS
+from benchmarks.suite import csv_sintetico
+
+
+def _bytes_csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def cambios(base: pd.DataFrame, proporcion: float = 0.01, semilla: int = 1) -> Dict[str, pd.DataFrame]:
+    """Versiones nuevas de ``base`` con ``proporcion`` de filas cambiadas."""
+    rng = np.random.default_rng(semilla)
+    k = max(1, int(len(base) * proporcion))
+
+    def al_azar() -> np.ndarray:
+        return rng.choice(len(base), k, replace=False)
+
+    modificado = base.copy()
+    modificado.loc[al_azar(), "DESCRIPCIÓN"] = "reciclaje de plástico y compostaje"
+    mezcla = pd.concat([base.drop(index=al_azar()), base.head(50), base.head(50)])
+    mezcla = mezcla.sample(frac=1, random_state=semilla)
+    mezcla.iloc[:20, mezcla.columns.get_loc("SECTOR")] = "9. Nuevo sector"
+    return {
+        "filas agregadas": pd.concat(
+            [base, base.sample(k, random_state=semilla).assign(**{"RAZÓN SOCIAL": lambda d: d["RAZÓN SOCIAL"] + " bis"})]
+        ),
+        "filas modificadas": modificado,
+        "filas eliminadas": base.drop(index=al_azar()),
+        "mezcla y otro orden": mezcla,
+    }
+
+
+def _cubo_ordenado(cubo: pd.DataFrame) -> pd.DataFrame:
+    from data_loader import DIMENSIONES_CUBO
+
+    dimensiones = [d for d in DIMENSIONES_CUBO if d in cubo.columns]
+    return cubo.sort_values(dimensiones, na_position="first", kind="stable").reset_index(drop=True)
+
+
+def _iguales(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    try:
+        pd.testing.assert_frame_equal(a, b)
+    except AssertionError:
+        return False
+    return True
+
+
+def _ms(funcion: Callable[[], object]):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def comparar(base: pd.DataFrame) -> Dict[str, Dict[str, object]]:
+    from agregados import calcular_agregados
+    from data_loader import procesar_contenido
+
+    anterior = procesar_contenido(_bytes_csv(base))
+    resultados = {}
+    for nombre, nuevo in cambios(base).items():
+        contenido = _bytes_csv(nuevo)
+        completo, ms_completo = _ms(lambda: procesar_contenido(contenido))
+        incremental, ms_incremental = _ms(lambda: procesar_contenido(contenido, anterior=anterior))
+        agregados = calcular_agregados(completo.cubo), calcular_agregados(incremental.cubo)
+        resultados[nombre] = {
+            "completo": ms_completo,
+            "incremental": ms_incremental,
+            "dataset": bytes_feather(completo.frame) == bytes_feather(incremental.frame),
+            "cubo": _iguales(_cubo_ordenado(completo.cubo), _cubo_ordenado(incremental.cubo)),
+            "agregados": all(
+                (a is None and b is None) or (a is not None and b is not None and _iguales(a, b))
+                for a, b in zip(agregados[0].values(), agregados[1].values())
+            ),
+        }
+    return resultados
+
+
+def instantanea_mezclada_detectada(base: pd.DataFrame) -> bool:
+    """Simula un corte entre tablas al guardar y comprueba que no se reutiliza la instantánea."""
+    from data_loader import leer_procesado, procesar_contenido
+    from snapshot import TABLA_CUBO, TABLA_DATOS, TABLA_HUELLAS, guardar_snapshot, leer_manifiesto
+
+    def tablas(procesado) -> Dict[str, pd.DataFrame]:
+        return {
+            TABLA_DATOS: procesado.frame,
+            TABLA_CUBO: procesado.cubo,
+            TABLA_HUELLAS: pd.DataFrame({"HUELLA": procesado.huellas}),
+        }
+
+    vieja = procesar_contenido(_bytes_csv(base))
+    nueva = procesar_contenido(_bytes_csv(base.iloc[len(base) // 10:]))
+    with tempfile.TemporaryDirectory() as nombre_carpeta:
+        carpeta = Path(nombre_carpeta)
+        guardar_snapshot(carpeta, tablas(vieja), {"columnas_fuente": vieja.columnas})
+        manifiesto = leer_manifiesto(carpeta)
+        # Solo llega a escribirse el dataset nuevo; el manifiesto sigue siendo el viejo.
+        nueva.frame.to_feather(carpeta / f"{TABLA_DATOS}.feather", compression="lz4")
+        return leer_manifiesto(carpeta) is None and leer_procesado(carpeta, manifiesto) is None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamano", choices=list(TAMANOS), default="100k")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    from instrumentacion import REGISTRO
+
+    REGISTRO.archivo = None
+    base = pd.read_csv(csv_sintetico(args.tamano, args.semilla))
+    print(f"{args.tamano} filas")
+    print(f"{'cambio':<22}{'completo':>12}{'incremental':>14}  dataset  cubo  agregados")
+    for nombre, r in comparar(base).items():
+        marcas = ["sí" if r[clave] else "NO" for clave in ("dataset", "cubo", "agregados")]
+        print(
+            f"{nombre:<22}{r['completo']:>10.0f}ms{r['incremental']:>12.0f}ms"
+            f"  {marcas[0]:>7}  {marcas[1]:>4}  {marcas[2]:>9}"
+        )
+    print(f"instantánea mezclada descartada: {'sí' if instantanea_mezclada_detectada(base) else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Tiempo por etapa de la limpieza de ``load_data`` sobre un CSV.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_limpieza ruta/al/archivo.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pandas as pd
+
+from data_loader import limpiar_dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("csv", help="CSV con la forma del listado de Negocios Verdes")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    crudo = pd.read_csv(args.csv)
+    tiempos = {"lectura": time.perf_counter() - inicio}
+
+    inicio = time.perf_counter()
+    limpiar_dataset(crudo, tiempos)
+    total = time.perf_counter() - inicio
+
+    print(f"Filas: {len(crudo):,}")
+    for etapa, segundos in tiempos.items():
+        print(f"  {etapa:<15} {segundos * 1000:10.1f} ms")
+    print(f"  {'limpieza total':<15} {total * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Memoria por columna y tiempo de agregaciones antes/después de ``optimizar_tipos``.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_memoria ruta/al/archivo.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import pandas as pd
+
+from data_loader import limpiar_dataset, optimizar_tipos, reporte_memoria
+
+# Agregaciones equivalentes a las de graficos.py.
+AGREGACIONES = {
+    "top sectores": lambda df: df["SECTOR"].value_counts().head(10),
+    "por departamento": lambda df: df.groupby("DEPARTAMENTO", observed=True).size(),
+    "por año": lambda df: df.groupby("AÑO", observed=True).size(),
+    "autoridades": lambda df: df["AUTORIDAD AMBIENTAL"].value_counts(),
+}
+
+
+def _medir(funcion, df: pd.DataFrame, repeticiones: int = 5) -> float:
+    """Mejor tiempo (ms) de varias repeticiones."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(df)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("csv", help="CSV con la forma del listado de Negocios Verdes")
+    args = parser.parse_args()
+
+    antes = limpiar_dataset(pd.read_csv(args.csv), optimizar=False)
+    despues = optimizar_tipos(antes.copy())
+
+    with pd.option_context("display.width", 140, "display.max_columns", None):
+        print(reporte_memoria(antes, despues))
+
+    print("\nAgregaciones (mejor de 5, ms):")
+    for nombre, funcion in AGREGACIONES.items():
+        print(f"  {nombre:<18} {_medir(funcion, antes):8.2f} -> {_medir(funcion, despues):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Escalamiento de la lectura y limpieza en paralelo según el número de procesos.
+
+Para cada número de trabajadores mide la lectura del CSV (Arrow multihilo desde 2
+trabajadores) y la limpieza repartida entre procesos (``limpiar_en_paralelo``) sobre
+un listado sintético, y comprueba que el resultado es idéntico byte a byte al de la
+corrida en serie. El umbral ``FILAS_MINIMAS_PARALELO`` no se aplica aquí.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_paralelo --tamano 1M --trabajadores 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import statistics
+import time
+from typing import Dict, List
+
+from benchmarks.medicion import bytes_feather
+from benchmarks.sintetico import TAMANOS
+from benchmarks.suite import csv_sintetico
+
+
+def _corrida(contenido: bytes, trabajadores: int) -> Dict[str, object]:
+    from data_loader import leer_csv, limpiar_dataset, limpiar_en_paralelo
+
+    inicio = time.perf_counter()
+    crudo = leer_csv(contenido, paralelo=trabajadores > 1)
+    lectura = time.perf_counter() - inicio
+    if trabajadores > 1:
+        df = limpiar_en_paralelo(crudo, trabajadores)
+    else:
+        df = limpiar_dataset(crudo)
+    total = time.perf_counter() - inicio
+    return {"lectura": lectura, "limpieza": total - lectura, "total": total, "df": df}
+
+
+def medir(contenido: bytes, trabajadores: List[int], repeticiones: int) -> Dict[int, Dict[str, float]]:
+    referencia = bytes_feather(_corrida(contenido, 1)["df"])
+    resultados = {}
+    for n in trabajadores:
+        corridas = [_corrida(contenido, n) for _ in range(repeticiones)]
+        resultados[n] = {
+            etapa: statistics.median(c[etapa] for c in corridas) * 1000
+            for etapa in ("lectura", "limpieza", "total")
+        }
+        resultados[n]["identico"] = all(bytes_feather(c["df"]) == referencia for c in corridas)
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamano", choices=list(TAMANOS), default="1M")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument(
+        "--trabajadores",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    from instrumentacion import REGISTRO
+
+    REGISTRO.archivo = None
+    contenido = csv_sintetico(args.tamano, args.semilla).read_bytes()
+    resultados = medir(contenido, args.trabajadores, args.repeticiones)
+
+    base = resultados[min(resultados)]["total"]
+    print(f"{args.tamano} filas, {os.cpu_count()} núcleos")
+    print(f"{'procesos':>8}{'lectura':>12}{'limpieza':>12}{'total':>12}{'aceleración':>13}  idéntico")
+    for n, r in resultados.items():
+        print(
+            f"{n:>8}{r['lectura']:>10.0f}ms{r['limpieza']:>10.0f}ms{r['total']:>10.0f}ms"
+            f"{base / r['total']:>12.2f}x  {'sí' if r['identico'] else 'NO'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
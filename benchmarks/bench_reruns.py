@@ -0,0 +1,199 @@
+"""
+Latencia de reruns completos de ``main.py`` con N sesiones concurrentes (AppTest).
+
+Cada sesión es un ``AppTest`` propio (su propio ``session_state``) que comparte con
+las demás las cachés del proceso, como en un servidor real. Las sesiones corren en
+hilos y repiten los pasos de cada escenario:
+
+- ``secciones``: recorrer todas las secciones del menú lateral.
+- ``filtros``: en Inicio, elegir regiones, sectores, categorías y buscar texto.
+
+``AppTest`` no es seguro entre hilos (reemplaza el ``Runtime`` global en cada
+ejecución), así que los reruns de las sesiones se atienden de a uno. La latencia se
+mide desde que la sesión pide el rerun, de modo que incluye la espera detrás de las
+otras sesiones: lo que el usuario espera con N sesiones activas. Aparte se informa
+el tiempo de ejecución del script sin la espera.
+
+Se informa p50/p95/p99 de la latencia por rerun y el pico de memoria de cada
+escenario. Los datos son un CSV sintético local (sin conexión).
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_reruns --filas 10000 --sesiones 8 --iteraciones 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.medicion import memoria_mb, percentiles, reiniciar_pico
+from benchmarks.sintetico import generar_listado
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Un rerun de AppTest a la vez (ver docstring).
+_TURNO = threading.Lock()
+
+Paso = Callable[[object], None]
+
+
+def _widget(lista, etiqueta: str):
+    """Widget de ``lista`` (p. ej. ``at.multiselect``) por su etiqueta."""
+    for widget in lista:
+        if widget.label == etiqueta:
+            return widget
+    raise LookupError(f"No se encontró el widget '{etiqueta}'")
+
+
+def _ir_a(seccion: str) -> Paso:
+    def paso(at) -> None:
+        _widget(at.sidebar.radio, "Selecciona una sección").set_value(seccion)
+
+    return paso
+
+
+def _elegir(etiqueta: str, cuantas: int) -> Paso:
+    def paso(at) -> None:
+        widget = _widget(at.multiselect, etiqueta)
+        widget.set_value(list(widget.options[:cuantas]))
+
+    return paso
+
+
+def _buscar(texto: str) -> Paso:
+    def paso(at) -> None:
+        _widget(at.text_input, "Buscar en el listado").set_value(texto)
+
+    return paso
+
+
+def _limpiar_filtros(at) -> None:
+    for etiqueta in ("Selecciona regiones", "Selecciona sectores", "Categorías Basura Cero"):
+        _widget(at.multiselect, etiqueta).set_value([])
+    _widget(at.text_input, "Buscar en el listado").set_value("")
+
+
+def escenarios() -> Dict[str, List[Paso]]:
+    from main import SECCIONES
+
+    return {
+        "secciones": [_ir_a(seccion) for seccion in list(SECCIONES)[1:] + ["Inicio"]],
+        "filtros": [
+            _elegir("Selecciona regiones", 1),
+            _elegir("Selecciona sectores", 2),
+            _elegir("Categorías Basura Cero", 1),
+            _buscar("miel"),
+            _buscar("reciclaje plast"),
+            _limpiar_filtros,
+        ],
+    }
+
+
+def _nueva_sesion():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(RAIZ / "main.py"), default_timeout=600)
+    with _TURNO:
+        at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def _correr(at, pasos: List[Paso], iteraciones: int) -> List[Tuple[float, float]]:
+    """(latencia, ejecución) en ms de cada rerun de la sesión."""
+    medidas = []
+    for _ in range(iteraciones):
+        for paso in pasos:
+            paso(at)
+            pedido = time.perf_counter()
+            with _TURNO:
+                inicio = time.perf_counter()
+                at.run()
+                fin = time.perf_counter()
+            medidas.append(((fin - pedido) * 1000, (fin - inicio) * 1000))
+            if at.exception:
+                raise RuntimeError(at.exception[0].message)
+    return medidas
+
+
+def medir(sesiones: int, iteraciones: int) -> Dict[str, Dict[str, float]]:
+    """Corre cada escenario con ``sesiones`` sesiones concurrentes."""
+    resultados = {}
+    with ThreadPoolExecutor(max_workers=sesiones) as pool:
+        reiniciar_pico()
+        inicio = time.perf_counter()
+        apps = list(pool.map(lambda _: _nueva_sesion(), range(sesiones)))
+        resultados["inicio de sesion"] = {
+            "reruns": sesiones,
+            "total_s": time.perf_counter() - inicio,
+            "rss_pico_mb": memoria_mb()["pico"],
+        }
+
+        for nombre, pasos in escenarios().items():
+            reiniciar_pico()
+            inicio = time.perf_counter()
+            medidas = [
+                m for lista in pool.map(lambda at: _correr(at, pasos, iteraciones), apps) for m in lista
+            ]
+            resultados[nombre] = {
+                "reruns": len(medidas),
+                **percentiles([latencia for latencia, _ in medidas]),
+                "ejecucion_p50_ms": percentiles([ejecucion for _, ejecucion in medidas])["p50_ms"],
+                "total_s": time.perf_counter() - inicio,
+                "rss_pico_mb": memoria_mb()["pico"],
+            }
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, default=10_000, help="Filas del CSV sintético")
+    parser.add_argument("--csv", help="Usar este CSV en lugar de uno sintético")
+    parser.add_argument("--sesiones", type=int, default=8)
+    parser.add_argument("--iteraciones", type=int, default=3)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as carpeta:
+        csv = args.csv
+        if csv is None:
+            csv = os.path.join(carpeta, "listado.csv")
+            generar_listado(args.filas, 0).to_csv(csv, index=False)
+        # La configuración se lee al importar config: fijar antes de cargar la app.
+        os.environ["DASHBOARD_DATA_PATH"] = str(Path(csv).resolve())
+        os.environ["DASHBOARD_SNAPSHOT_DIR"] = os.path.join(carpeta, "snapshot")
+        os.environ["DASHBOARD_PROFILE_LOG"] = ""
+        os.chdir(RAIZ)
+
+        resultados = medir(args.sesiones, args.iteraciones)
+
+    print(f"{args.sesiones} sesiones x {args.iteraciones} iteraciones")
+    for nombre, r in resultados.items():
+        if "p50_ms" in r:
+            print(
+                f"  {nombre:<18} {r['reruns']:5d} reruns  p50 {r['p50_ms']:8.1f} ms  "
+                f"p95 {r['p95_ms']:8.1f} ms  p99 {r['p99_ms']:8.1f} ms  "
+                f"(ejecución p50 {r['ejecucion_p50_ms']:6.1f} ms)  pico RSS {r['rss_pico_mb']:7.1f} MB"
+            )
+        else:
+            print(
+                f"  {nombre:<18} {r['reruns']:5d} sesiones en {r['total_s']:.1f} s  "
+                f"pico RSS {r['rss_pico_mb']:7.1f} MB"
+            )
+    if args.salida:
+        Path(args.salida).write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Latencia por rerun y memoria con N sesiones concurrentes: cache_data vs. dataset compartido.
+
+Cada modo corre en un subproceso propio para que la memoria pico sea comparable.
+
+- ``antes``: ``st.cache_data`` para el dataset y cachés derivadas que hashean el DataFrame.
+- ``despues``: ``Dataset`` compartido con ``st.cache_resource`` y cachés por versión.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.bench_sesiones ruta/al/archivo.csv --sesiones 20 --reruns 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.medicion import memoria_mb, reiniciar_pico
+
+
+def _rerun_antes(df: pd.DataFrame) -> Callable[[], None]:
+    """Reproduce el patrón anterior: todo con st.cache_data."""
+    import streamlit as st
+
+    from agregados import opciones_filtros
+    from sections.home import resumen_texto
+
+    @st.cache_data(show_spinner=False)
+    def cargar() -> pd.DataFrame:
+        return df
+
+    @st.cache_data(show_spinner=False)
+    def resumen(datos: pd.DataFrame) -> str:
+        return resumen_texto.__wrapped__(datos, "")
+
+    @st.cache_data(show_spinner=False)
+    def opciones(datos: pd.DataFrame):
+        return opciones_filtros(datos)
+
+    def rerun() -> None:
+        datos = cargar()
+        resumen(datos)
+        opciones(datos)
+
+    return rerun
+
+
+def _rerun_despues(df: pd.DataFrame) -> Callable[[], None]:
+    """Patrón actual: Dataset compartido y cachés indexadas por versión."""
+    import streamlit as st
+
+    from data_loader import construir_cubo
+    from dataset import Dataset
+    from sections.home import resumen_texto
+
+    @st.cache_resource(show_spinner=False)
+    def cargar() -> Dataset:
+        return Dataset(frame=df, cubo=construir_cubo(df), version="bench")
+
+    def rerun() -> None:
+        dataset = cargar()
+        resumen_texto(dataset.frame, dataset.version)
+        dataset.opciones_filtros
+
+    return rerun
+
+
+def _medir_modo(csv: str, modo: str, sesiones: int, reruns: int) -> Dict[str, float]:
+    """Ejecuta ``sesiones`` hilos con ``reruns`` cada uno y devuelve métricas."""
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    from data_loader import limpiar_dataset
+
+    df = limpiar_dataset(pd.read_csv(csv))
+    rerun = _rerun_antes(df) if modo == "antes" else _rerun_despues(df)
+    rerun()  # llena las cachés
+    reiniciar_pico()
+    base = memoria_mb()
+
+    def sesion(_: int) -> List[float]:
+        latencias = []
+        for _ in range(reruns):
+            inicio = time.perf_counter()
+            rerun()
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        return latencias
+
+    with ThreadPoolExecutor(max_workers=sesiones) as pool:
+        latencias = np.concatenate(list(pool.map(sesion, range(sesiones))))
+
+    memoria = memoria_mb()
+    return {
+        "p50_ms": float(np.percentile(latencias, 50)),
+        "p95_ms": float(np.percentile(latencias, 95)),
+        "rss_base_mb": base["rss"],
+        "rss_pico_mb": memoria["pico"],
+        "rss_extra_mb": memoria["pico"] - base["rss"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("csv", help="CSV con la forma del listado de Negocios Verdes")
+    parser.add_argument("--sesiones", type=int, default=20)
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--modo", choices=["antes", "despues"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        print(json.dumps(_medir_modo(args.csv, args.modo, args.sesiones, args.reruns)))
+        return
+
+    print(f"{args.sesiones} sesiones x {args.reruns} reruns")
+    for modo in ("antes", "despues"):
+        salida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_sesiones", args.csv, "--modo", modo,
+             "--sesiones", str(args.sesiones), "--reruns", str(args.reruns)],
+            capture_output=True, text=True, check=True,
+        )
+        m = json.loads(salida.stdout.strip().splitlines()[-1])
+        print(
+            f"  {modo:<8} p50 {m['p50_ms']:8.1f} ms  p95 {m['p95_ms']:8.1f} ms  "
+            f"RSS base {m['rss_base_mb']:7.1f} MB  pico {m['rss_pico_mb']:7.1f} MB  "
+            f"(+{m['rss_extra_mb']:.1f} MB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
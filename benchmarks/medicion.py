@@ -0,0 +1,52 @@
+"""
+Utilidades compartidas por los benchmarks: memoria del proceso, percentiles y
+comparación de resultados.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Sequence
+
+import io
+
+import numpy as np
+import pandas as pd
+
+
+def memoria_mb() -> Dict[str, float]:
+    """RSS actual y pico del proceso (MB), leídos de /proc en Linux."""
+    valores = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for linea in f:
+                if linea.startswith(("VmRSS:", "VmHWM:")):
+                    clave, cantidad, _ = linea.split()
+                    valores[clave.rstrip(":")] = int(cantidad) / 1024
+    except FileNotFoundError:
+        import resource
+
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        valores = {"VmRSS": pico, "VmHWM": pico}
+    return {"rss": valores["VmRSS"], "pico": valores["VmHWM"]}
+
+
+def reiniciar_pico() -> None:
+    """Reinicia el pico de RSS (solo Linux) para medir únicamente lo que sigue."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def percentiles(latencias_ms: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99 de una lista de latencias en ms."""
+    valores = np.asarray(latencias_ms, dtype=float)
+    return {f"p{p}_ms": float(np.percentile(valores, p)) for p in (50, 95, 99)}
+
+
+def bytes_feather(df: pd.DataFrame) -> bytes:
+    """Feather sin comprimir de ``df``, para comparar resultados byte a byte."""
+    destino = io.BytesIO()
+    df.to_feather(destino, compression="uncompressed")
+    return destino.getvalue()
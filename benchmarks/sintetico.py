@@ -0,0 +1,175 @@
+"""
+Datos sintéticos con la forma del listado de Negocios Verdes para benchmarks.
+
+Todo es determinista para una semilla dada. Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.sintetico --filas 100000 datos_100k.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from dictionaries import DEPARTMENT_CANONICAL, MAPEO_REGION
+
+# Tamaños de referencia para la suite de benchmarks.
+TAMANOS = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+
+FRASES_DESCRIPCION = [
+    "producción y comercialización de miel de abejas",
+    "reciclaje de plástico y cartón",
+    "compostaje de residuos orgánicos",
+    "elaboración de abono orgánico",
+    "instalación de paneles: energía solar fotovoltaica",
+    "transformación sostenible de frutos amazónicos",
+    "ecodiseño de empaques biodegradables",
+    "economía circular en la industria textil",
+    "bioinsumos para cultivos de café",
+    "turismo de naturaleza y avistamiento de aves",
+    "artesanías en fibras naturales",
+    "café especial de origen",
+    "sistema de producción ecológica",
+    "aprovechamiento de llantas usadas",
+]
+
+SECTORES = [
+    "1. Agrosistemas sostenibles",
+    "2. Aprovechamiento y valorización de residuos",
+    "3. Bioproductos",
+    "4. Ecoturismo",
+    "5. Fuentes no convencionales de energía renovable",
+    "6. Construcción sostenible",
+]
+
+SUBSECTORES = [
+    "1.1 Sistema de producción ecológico",
+    "1.2 Sistema de producción orgánico",
+    "2.1 Aprovechamiento de residuos sólidos",
+    "3.1 No maderables",
+    "Biocomercio",
+]
+
+
+def generar_textos(filas: int, semilla: int = 0) -> pd.DataFrame:
+    """Genera las columnas de texto que usa el clasificador Basura Cero."""
+    rng = np.random.default_rng(semilla)
+    frases = np.array(FRASES_DESCRIPCION, dtype=object)
+    descripciones = [
+        " y ".join(rng.choice(frases, size=k, replace=False)) if k else np.nan
+        for k in rng.integers(0, 4, size=filas)
+    ]
+    return pd.DataFrame(
+        {
+            "DESCRIPCIÓN": descripciones,
+            "SECTOR": rng.choice(np.array(SECTORES, dtype=object), size=filas),
+            "SUBSECTOR": rng.choice(np.array(SUBSECTORES + [np.nan], dtype=object), size=filas),
+        }
+    )
+
+
+CATEGORIAS = [
+    "1. Bienes y servicios sostenibles provenientes de recursos naturales",
+    "2. Ecoproductos industriales",
+    "3. Mercado de carbono",
+]
+
+PRODUCTOS = ["Miel", "miel.", "Café", "Abono orgánico", "Artesanías", "Compost", "Ecoturismo", "Panela"]
+
+MUNICIPIOS = ["Medellín", "Cali", "Pasto", "Leticia", "Villavicencio", "Santa Marta", "Tunja", "Quibdó"]
+
+# Variantes "desordenadas" de un texto, como llegan en el CSV real.
+VARIANTES_TEXTO: List[Callable[[str], str]] = [
+    lambda t: t,
+    lambda t: t.lower(),
+    lambda t: t.title(),
+    lambda t: f"  {t} ",
+    lambda t: t.replace(" ", "  "),
+]
+
+
+def _elegir(rng: np.random.Generator, valores, filas: int, nulos: float = 0.0) -> np.ndarray:
+    """Muestra ``filas`` valores (con una fracción ``nulos`` de NaN)."""
+    resultado = rng.choice(np.array(valores, dtype=object), size=filas)
+    if nulos:
+        resultado[rng.random(filas) < nulos] = np.nan
+    return resultado
+
+
+def _desordenar(rng: np.random.Generator, valores: np.ndarray, proporcion: float) -> np.ndarray:
+    """Aplica variantes de mayúsculas/espacios a una ``proporcion`` de los valores."""
+    resultado = valores.copy()
+    elegidos = np.flatnonzero((rng.random(len(valores)) < proporcion) & pd.notna(valores))
+    variantes = rng.integers(1, len(VARIANTES_TEXTO), size=len(elegidos))
+    # Se transforma cada par (valor, variante) distinto una sola vez.
+    pares = pd.DataFrame({"valor": valores[elegidos], "variante": variantes})
+    for (valor, variante), grupo in pares.groupby(["valor", "variante"]).groups.items():
+        resultado[elegidos[grupo]] = VARIANTES_TEXTO[variante](valor)
+    return resultado
+
+
+def generar_listado(filas: int, semilla: int = 0) -> pd.DataFrame:
+    """
+    CSV crudo con la forma del listado de Negocios Verdes.
+
+    - Departamentos con las grafías de ``DEPARTMENT_CANONICAL`` (con y sin tilde) y
+      variantes de mayúsculas/espacios.
+    - Autoridades de ``MAPEO_REGION``; la región es la de la autoridad, pero a veces
+      falta o dice "No registra" (para ejercitar el relleno por autoridad).
+    - Categoría, sector y subsector con prefijos numéricos ("1. SECTOR").
+    - Descripciones con las palabras clave del clasificador Basura Cero.
+    """
+    rng = np.random.default_rng(semilla)
+
+    autoridades = _elegir(rng, list(MAPEO_REGION), filas, nulos=0.03)
+    regiones = pd.Series(autoridades).map(MAPEO_REGION).to_numpy(dtype=object)
+    faltantes = rng.random(filas)
+    regiones[faltantes < 0.10] = np.nan
+    regiones[(faltantes >= 0.10) & (faltantes < 0.15)] = "No registra"
+
+    anios = rng.integers(2014, 2025, size=filas).astype(object)
+    con_coma = rng.random(filas) < 0.05
+    anios[con_coma] = [f"{a // 1000},{a % 1000:03d}" for a in anios[con_coma]]
+    anios[rng.random(filas) < 0.01] = np.nan
+
+    frases = np.array(FRASES_DESCRIPCION, dtype=object)
+    partes = frases[rng.integers(0, len(frases), size=(filas, 3))]
+    cantidad = rng.integers(0, 4, size=filas)
+    municipios = _elegir(rng, MUNICIPIOS, filas)
+    descripciones = partes[:, 0]
+    descripciones = np.where(cantidad >= 2, descripciones + " y " + partes[:, 1], descripciones)
+    descripciones = np.where(cantidad >= 3, descripciones + " y " + partes[:, 2], descripciones)
+    descripciones = descripciones + " en " + municipios
+    descripciones[cantidad == 0] = np.nan
+
+    return pd.DataFrame(
+        {
+            "AÑO\n(registro)": anios,
+            "AUTORIDAD AMBIENTAL": _desordenar(rng, autoridades, 0.1),
+            "REGIÓN": _desordenar(rng, regiones, 0.3),
+            "DEPARTAMENTO": _desordenar(rng, _elegir(rng, list(DEPARTMENT_CANONICAL), filas, 0.01), 0.3),
+            "MUNICIPIO": municipios,
+            "RAZÓN SOCIAL": "Negocio verde " + pd.Series(rng.permutation(filas)).astype(str).to_numpy(dtype=object),
+            "CATEGORÍA": _elegir(rng, CATEGORIAS, filas, 0.02),
+            "SECTOR": _desordenar(rng, _elegir(rng, SECTORES, filas, 0.02), 0.1),
+            "SUBSECTOR": _elegir(rng, SUBSECTORES, filas, 0.1),
+            "PRODUCTO PRINCIPAL": _elegir(rng, PRODUCTOS, filas, 0.05),
+            "DESCRIPCIÓN": descripciones,
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("salida", help="Ruta del CSV a generar")
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+    generar_listado(args.filas, args.semilla).to_csv(args.salida, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Suite de benchmarks del pipeline sobre datos sintéticos (funciona sin conexión).
+
+Para cada tamaño genera (o reutiliza) un CSV determinista con
+``benchmarks.sintetico.generar_listado`` y mide:
+
+- la lectura, cada etapa de limpieza de ``load_data`` y el cubo de agregados;
+- cada agregado de ``agregados.py`` sobre el cubo y cada función ``plot_*`` de
+  ``graficos.py`` sobre su agregado, armando la figura y tomándola de la caché;
+- todos los agregados con los filtros globales de Inicio (cubo filtrado con bitmaps,
+  sin la memoria entre reruns de la app), en serie y con el pool de hilos de
+  ``Dataset.agregados_filtrados``;
+- los índices y filtros de la tabla de Inicio (bitmaps y búsqueda de texto).
+
+Los resultados (mediana de las repeticiones, en ms) se guardan en JSON para
+compararlos entre versiones. Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.suite --tamanos 10k 100k --salida resultados.json
+    python -m benchmarks.suite --tamanos 10k 100k --comparar resultados.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import TAMANOS, generar_listado
+from config import BASE_DIR
+
+CARPETA_DATOS = BASE_DIR / ".cache" / "benchmarks"
+
+Resultados = Dict[str, Dict[str, float]]
+
+
+def _mediana_ms(funcion: Callable[[], object], repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def csv_sintetico(tamano: str, semilla: int) -> Path:
+    """Ruta del CSV sintético de ``tamano``; se genera la primera vez."""
+    ruta = CARPETA_DATOS / f"listado-{tamano}-s{semilla}.csv"
+    if not ruta.exists():
+        CARPETA_DATOS.mkdir(parents=True, exist_ok=True)
+        generar_listado(TAMANOS[tamano], semilla).to_csv(ruta, index=False)
+    return ruta
+
+
+def medir_carga(csv: Path, repeticiones: int) -> Resultados:
+    """Lectura + etapas de ``limpiar_dataset`` + cubo, como en ``cargar_datos``."""
+    from data_loader import construir_cubo, limpiar_dataset
+
+    corridas: List[Dict[str, float]] = []
+    for _ in range(repeticiones):
+        tiempos: Dict[str, float] = {}
+        inicio = time.perf_counter()
+        crudo = pd.read_csv(csv)
+        tiempos["lectura"] = time.perf_counter() - inicio
+        df = limpiar_dataset(crudo, tiempos)
+        inicio = time.perf_counter()
+        construir_cubo(df)
+        tiempos["cubo"] = time.perf_counter() - inicio
+        tiempos["total"] = sum(tiempos.values())
+        corridas.append(tiempos)
+    return {etapa: statistics.median(c[etapa] for c in corridas) * 1000 for etapa in corridas[0]}
+
+
+# Función de graficos.py -> agregados que recibe.
+GRAFICOS = {
+    "plot_mapa_basura_cero_por_departamento": ("mapa",),
+    "plot_top_sectores": ("top_sectores",),
+    "plot_tendencia_anual": ("tendencia",),
+    "plot_relacion_basura_cero": ("relacion", "categorias"),
+    "plot_autoridades": ("autoridades",),
+}
+
+
+def medir_graficos(cubo: pd.DataFrame, repeticiones: int) -> Resultados:
+    """Cada agregado sobre el cubo y cada ``plot_*`` sobre su agregado, sin y con caché de figuras."""
+    import graficos
+    from agregados import AGREGADOS, calcular_agregados
+
+    resultados = {
+        f"agregado_{nombre}": _mediana_ms(lambda f=f: f(cubo), repeticiones)
+        for nombre, f in AGREGADOS.items()
+    }
+    agregados = calcular_agregados(cubo)
+    for nombre, entradas in GRAFICOS.items():
+        argumentos = [agregados[entrada] for entrada in entradas]
+        funcion = getattr(graficos, nombre)
+        resultados[nombre] = _mediana_ms(lambda f=funcion, a=argumentos: f(*a), repeticiones)
+        funcion(*argumentos, clave="suite")  # la primera llamada guarda la figura
+        resultados[f"{nombre} (caché)"] = _mediana_ms(
+            lambda f=funcion, a=argumentos: f(*a, clave="suite"), repeticiones
+        )
+    return resultados
+
+
+def medir_graficos_filtrados(df: pd.DataFrame, cubo: pd.DataFrame, repeticiones: int) -> Resultados:
+    """Recalcular todos los agregados tras un cambio de filtro, como en Inicio."""
+    from agregados import AGREGADOS, Filtros, filtros_aplicables, opciones_filtros
+    from indices import IndiceFiltros
+
+    def recalcular(filtros: Filtros) -> None:
+        for nombre, funcion in AGREGADOS.items():
+            funcion(indice.filtrar(cubo, *filtros_aplicables(nombre, filtros)))
+
+    resultados = {"indice_cubo": _mediana_ms(lambda: IndiceFiltros(cubo), 1)}
+    indice = IndiceFiltros(cubo)
+    regiones, sectores, categorias = opciones_filtros(cubo)
+    escenarios = {
+        "una region": Filtros(tuple(regiones[:1])),
+        "region+sectores": Filtros(tuple(regiones[:1]), tuple(sectores[:2])),
+        "region+sectores+categoria": Filtros(tuple(regiones[:1]), tuple(sectores[:2]), tuple(categorias[:1])),
+        "dos regiones+sectores+categoria": Filtros(
+            tuple(regiones[:2]), tuple(sectores[:2]), tuple(categorias[:1])
+        ),
+    }
+    for nombre, filtros in escenarios.items():
+        resultados[nombre] = _mediana_ms(lambda f=filtros: recalcular(f), repeticiones)
+
+    # Plan de Inicio (incluye armar el índice del cubo): una versión nueva en cada
+    # repetición para no acertar la memoria.
+    from dataset import HILOS_AGREGADOS, Dataset
+
+    filtros = escenarios["dos regiones+sectores+categoria"]
+    versiones = iter(range(10**9))
+    for etiqueta, paralelo in (("plan en serie", False), (f"plan en {HILOS_AGREGADOS} hilos", True)):
+        resultados[etiqueta] = _mediana_ms(
+            lambda p=paralelo: Dataset(df, cubo, f"suite-{next(versiones)}").agregados_filtrados(filtros, p),
+            repeticiones,
+        )
+    return resultados
+
+
+def medir_filtros(df: pd.DataFrame, repeticiones: int) -> Resultados:
+    """Construcción de índices y escenarios de filtrado de la tabla de Inicio."""
+    from busqueda import IndiceTexto
+    from data_loader import CATEGORIAS_BASURA_CERO
+    from indices import IndiceFiltros
+
+    resultados = {
+        "indice_filtros": _mediana_ms(lambda: IndiceFiltros(df), 1),
+        "indice_busqueda": _mediana_ms(lambda: IndiceTexto(df), 1),
+    }
+    indice = IndiceFiltros(df)
+    busqueda = IndiceTexto(df)
+    region = sorted(indice.regiones)[:1]
+    sectores = sorted(indice.sectores)[:2]
+    categoria = CATEGORIAS_BASURA_CERO[:1]
+    escenarios = {
+        "una region": lambda: indice.filtrar(df, regiones=region),
+        "region+sectores+categoria": lambda: indice.filtrar(
+            df, regiones=region, sectores=sectores, categorias=categoria
+        ),
+        "busqueda 'miel'": lambda: indice.filtrar(df, adicional=busqueda.mascara("miel")),
+        "busqueda 'reciclaje plast' + filtros": lambda: indice.filtrar(
+            df, regiones=region, sectores=sectores, adicional=busqueda.mascara("reciclaje plast")
+        ),
+    }
+    for nombre, escenario in escenarios.items():
+        resultados[nombre] = _mediana_ms(escenario, repeticiones)
+    return resultados
+
+
+def ejecutar(tamanos: List[str], semilla: int, repeticiones: int) -> Dict[str, object]:
+    from data_loader import construir_cubo, limpiar_dataset
+
+    resultados: Dict[str, object] = {}
+    for tamano in tamanos:
+        csv = csv_sintetico(tamano, semilla)
+        print(f"[{tamano}] {csv}", flush=True)
+        df = limpiar_dataset(pd.read_csv(csv))
+        cubo = construir_cubo(df)
+        resultados[tamano] = {
+            "filas": len(df),
+            "carga": medir_carga(csv, repeticiones),
+            "graficos": medir_graficos(cubo, repeticiones),
+            "graficos_filtrados": medir_graficos_filtrados(df, cubo, repeticiones),
+            "filtros": medir_filtros(df, repeticiones),
+        }
+    return {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "semilla": semilla,
+        "repeticiones": repeticiones,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "resultados": resultados,
+    }
+
+
+def imprimir(actual: Dict[str, object], previo: Dict[str, object] = None) -> None:
+    anteriores = (previo or {}).get("resultados", {})
+    for tamano, grupos in actual["resultados"].items():
+        print(f"\n== {tamano} ({grupos['filas']:,} filas) ==")
+        for grupo in ("carga", "graficos", "graficos_filtrados", "filtros"):
+            print(f"  {grupo}")
+            for nombre, ms in grupos.get(grupo, {}).items():
+                linea = f"    {nombre:<48}{ms:10.1f} ms"
+                antes = anteriores.get(tamano, {}).get(grupo, {}).get(nombre)
+                if antes:
+                    linea += f"   antes {antes:10.1f} ms  (x{antes / ms:.2f})"
+                print(linea)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", nargs="+", choices=list(TAMANOS), default=["10k", "100k"])
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    from instrumentacion import REGISTRO
+
+    REGISTRO.archivo = None  # la suite no escribe en el historial de la app
+
+    actual = ejecutar(args.tamanos, args.semilla, args.repeticiones)
+    previo = json.loads(Path(args.comparar).read_text(encoding="utf-8")) if args.comparar else None
+    imprimir(actual, previo)
+    if args.salida:
+        Path(args.salida).write_text(json.dumps(actual, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
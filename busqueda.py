@@ -0,0 +1,182 @@
+"""
+Búsqueda de texto sobre el listado con un índice invertido.
+
+Cada campo indexado guarda, por término normalizado (sin tildes y en minúsculas),
+la lista ordenada de filas donde aparece (en formato CSR: un arreglo de filas y
+los cortes de cada término). Las subcadenas ("energ" encuentra "energía") se
+resuelven buscando sobre el vocabulario, que es mucho más chico que las filas,
+con ``pyarrow.compute``.
+
+El índice se puede guardar como tablas de Arrow (``IndiceTexto.tablas``) y volver a
+armar desde ellas sin tokenizar (``IndiceTexto.desde_tablas``), p. ej. mapeadas en
+memoria desde los artefactos de ``python -m data_loader build``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Union
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Campos indexados (se usan los que existan en el dataset).
+CAMPOS_BUSQUEDA = [
+    "DESCRIPCIÓN",
+    "PRODUCTO PRINCIPAL",
+    "RAZÓN SOCIAL",
+    "NOMBRE DEL NEGOCIO",
+    "SECTOR",
+]
+
+_TOKEN = re.compile(r"\w+")
+# Equivalente de ``\W+`` para las expresiones RE2 de pyarrow.
+_SEPARADOR = r"[^\p{L}\p{N}_]+"
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas y sin tildes: "Energía" -> "energia"."""
+    descompuesto = unicodedata.normalize("NFKD", str(texto).lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def normalizar_arrow(textos: pa.Array) -> pa.Array:
+    """``normalizar_texto`` vectorizado sobre un arreglo de pyarrow."""
+    textos = pc.utf8_normalize(pc.utf8_lower(textos), "NFKD")
+    return pc.replace_substring_regex(textos, r"\p{Mn}", "")
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Términos normalizados de un texto."""
+    return _TOKEN.findall(normalizar_texto(texto))
+
+
+def _rangos(inicios: np.ndarray, largos: np.ndarray) -> np.ndarray:
+    """Concatenación de ``arange(inicio, inicio + largo)`` para cada par, sin bucles."""
+    desplazamiento = np.arange(largos.sum()) - np.repeat(np.cumsum(largos) - largos, largos)
+    return np.repeat(inicios, largos) + desplazamiento
+
+
+class _Postings(NamedTuple):
+    terminos: np.ndarray  # ids de término presentes en el campo (ordenados)
+    cortes: np.ndarray  # filas[cortes[i]:cortes[i + 1]] son las filas de terminos[i]
+    filas: np.ndarray  # int32, ordenadas dentro de cada término
+
+
+class IndiceTexto:
+    """Índice invertido término -> filas, por campo, con búsqueda de subcadenas."""
+
+    def __init__(self, df: pd.DataFrame, campos: Iterable[str] = CAMPOS_BUSQUEDA):
+        self.filas = len(df)
+        self.campos = [campo for campo in campos if campo in df.columns]
+        vocabulario: Dict[str, int] = {}
+        self.postings: Dict[str, _Postings] = {
+            campo: self._indexar_campo(df[campo], vocabulario) for campo in self.campos
+        }
+        self.terminos: Union[pa.Array, pa.ChunkedArray] = pa.array(list(vocabulario), type=pa.string())
+
+    def tablas(self) -> Dict[str, pd.DataFrame]:
+        """
+        El índice como tablas: ``vocabulario`` (término por id) y, para el campo
+        ``i``, ``terminos_i`` (id e inicio de sus filas) y ``filas_i``.
+        """
+        tablas = {"vocabulario": pd.DataFrame({"TERMINO": self.terminos.to_pandas(types_mapper=pd.ArrowDtype)})}
+        for i, campo in enumerate(self.campos):
+            postings = self.postings[campo]
+            tablas[f"terminos_{i}"] = pd.DataFrame({"TERMINO": postings.terminos, "INICIO": postings.cortes[:-1]})
+            tablas[f"filas_{i}"] = pd.DataFrame({"FILA": postings.filas})
+        return tablas
+
+    @classmethod
+    def desde_tablas(cls, filas: int, campos: Iterable[str], tablas: Mapping[str, pa.Table]) -> "IndiceTexto":
+        """Índice de ``filas`` filas a partir de las tablas de ``tablas()`` (sin copiar el vocabulario)."""
+        indice = cls.__new__(cls)
+        indice.filas = filas
+        indice.campos = list(campos)
+        indice.terminos = tablas["vocabulario"].column("TERMINO")
+        indice.postings = {}
+        for i, campo in enumerate(indice.campos):
+            terminos = tablas[f"terminos_{i}"]
+            filas_campo = tablas[f"filas_{i}"].column("FILA").to_numpy()
+            indice.postings[campo] = _Postings(
+                terminos.column("TERMINO").to_numpy(),
+                np.append(terminos.column("INICIO").to_numpy(), len(filas_campo)),
+                filas_campo,
+            )
+        return indice
+
+    def _indexar_campo(self, serie: pd.Series, vocabulario: Dict[str, int]) -> _Postings:
+        """Tokeniza cada valor distinto una vez (con pyarrow) y expande a filas."""
+        codigos, valores = pd.factorize(serie)
+        if len(valores) == 0:
+            return _Postings(
+                np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32)
+            )
+
+        textos = pa.array(np.asarray(valores, dtype=object).astype(str))
+        tokens = pc.split_pattern_regex(normalizar_arrow(textos), _SEPARADOR)
+        id_valor = pc.list_parent_indices(tokens).to_numpy()
+        planos = pc.list_flatten(tokens).to_numpy(zero_copy_only=False)
+        no_vacios = planos != ""
+        id_valor, planos = id_valor[no_vacios], planos[no_vacios]
+
+        # Términos locales -> ids del vocabulario compartido por todos los campos.
+        locales, terminos = pd.factorize(planos)
+        globales = np.array(
+            [vocabulario.setdefault(t, len(vocabulario)) for t in terminos], dtype=np.int64
+        )
+        # Pares (término, valor) distintos, ordenados por término.
+        pares = np.unique(globales[locales] * len(valores) + id_valor)
+        termino_par, valor_par = np.divmod(pares, len(valores))
+
+        # Expandir cada par a las filas con ese valor (filas agrupadas por valor).
+        orden = np.argsort(codigos, kind="stable").astype(np.int32)
+        limites = np.searchsorted(codigos[orden], np.arange(len(valores) + 1))
+        largos = limites[valor_par + 1] - limites[valor_par]
+        filas = orden[_rangos(limites[valor_par], largos)]
+        termino_fila = np.repeat(termino_par, largos)
+
+        # Ordenar por (término, fila) y guardar en formato CSR.
+        indice = np.lexsort((filas, termino_fila))
+        filas, termino_fila = filas[indice], termino_fila[indice]
+        presentes, cortes = np.unique(termino_fila, return_index=True)
+        return _Postings(presentes, np.append(cortes, len(filas)), filas)
+
+    def _terminos_que_contienen(self, fragmento: str) -> np.ndarray:
+        """Ids de los términos del vocabulario que contienen ``fragmento``."""
+        coincide = pc.match_substring(self.terminos, fragmento)
+        return np.flatnonzero(coincide.to_numpy(zero_copy_only=False))
+
+    def _filas_de(self, campo: str, ids: np.ndarray) -> np.ndarray:
+        """Filas (con repeticiones) donde aparece alguno de los términos ``ids`` en ``campo``."""
+        postings = self.postings[campo]
+        posiciones = np.searchsorted(postings.terminos, ids)
+        validas = posiciones < len(postings.terminos)
+        ids, posiciones = ids[validas], posiciones[validas]
+        posiciones = posiciones[postings.terminos[posiciones] == ids]
+        inicios = postings.cortes[posiciones]
+        return postings.filas[_rangos(inicios, postings.cortes[posiciones + 1] - inicios)]
+
+    def mascara(self, consulta: str, campos: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        Filas que contienen todos los términos de la consulta (como subcadena).
+
+        ``campos`` limita la búsqueda a algunos campos indexados.
+        """
+        campos = self.campos if campos is None else [c for c in campos if c in self.postings]
+        resultado = np.ones(self.filas, dtype=bool)
+        for fragmento in tokenizar(consulta):
+            ids = self._terminos_que_contienen(fragmento)
+            coincide = np.zeros(self.filas, dtype=bool)
+            for campo in campos:
+                coincide[self._filas_de(campo, ids)] = True
+            resultado &= coincide
+        return resultado
+
+    def contar(self, consulta: str, campos: Optional[Iterable[str]] = None) -> int:
+        """Número de filas que coinciden con la consulta."""
+        return int(np.count_nonzero(self.mascara(consulta, campos)))
@@ -0,0 +1,94 @@
+"""
+Caché de figuras de Plotly ya construidas, compartida por todas las sesiones.
+
+Armar una figura con ``plotly.express`` cuesta decenas de milisegundos (mucho más
+que agregar el cubo o serializarla). Las figuras se guardan por clave —versión del
+dataset, gráfico y filtros que le aplican— y se reutilizan en los reruns, en las
+visitas repetidas y entre sesiones. ``st.plotly_chart`` no modifica la figura, así
+que compartirla es seguro.
+
+El tamaño de cada figura se estima por su JSON (lo que se envía al navegador) y,
+al superar ``FIGURE_CACHE_MB``, se descartan las menos usadas recientemente.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, NamedTuple, Optional
+
+import threading
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from config import FIGURE_CACHE_MB
+
+
+class _Entrada(NamedTuple):
+    figura: Optional[go.Figure]
+    bytes: int
+
+
+class CacheFiguras:
+    """LRU de figuras con tope de memoria."""
+
+    def __init__(self, limite_bytes: int):
+        self.limite_bytes = limite_bytes
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas: "OrderedDict[Hashable, _Entrada]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Hashable, construir: Callable[[], Optional[go.Figure]]) -> Optional[go.Figure]:
+        """La figura de ``clave``; si no está, se arma con ``construir`` y se guarda."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada.figura
+            self.fallos += 1
+
+        # Se construye fuera del lock: otra sesión puede armar la misma figura a la
+        # vez, pero no espera detrás de figuras ajenas.
+        figura = construir()
+        tamano = len(pio.to_json(figura, validate=False)) if figura is not None else 0
+        if tamano > self.limite_bytes:
+            return figura
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self.bytes_usados -= anterior.bytes
+            self._entradas[clave] = _Entrada(figura, tamano)
+            self.bytes_usados += tamano
+            while self.bytes_usados > self.limite_bytes:
+                _, descartada = self._entradas.popitem(last=False)
+                self.bytes_usados -= descartada.bytes
+        return figura
+
+    def estadisticas(self) -> Dict[str, float]:
+        """Figuras guardadas, memoria usada/límite (MB) y aciertos/fallos."""
+        with self._lock:
+            return {
+                "figuras": len(self._entradas),
+                "mb": self.bytes_usados / 2**20,
+                "limite_mb": self.limite_bytes / 2**20,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+            }
+
+
+CACHE_FIGURAS = CacheFiguras(int(FIGURE_CACHE_MB * 2**20))
+
+
+def figura(
+    clave: Optional[Hashable], nombre: str, construir: Callable[[], Optional[go.Figure]]
+) -> Optional[go.Figure]:
+    """
+    La figura ``nombre`` de ``clave`` desde la caché; sin clave, o con la caché
+    desactivada (``FIGURE_CACHE_MB=0``), se arma cada vez sin medirla.
+    """
+    if clave is None or CACHE_FIGURAS.limite_bytes <= 0:
+        return construir()
+    return CACHE_FIGURAS.obtener((clave, nombre), construir)
@@ -2,7 +2,44 @@
 Configuración global del proyecto.
 """
 
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
 DATA_URL = (
     "https://github.com/natachasena2023-sys/bootcam_analisis/raw/refs/heads/main/"
     "Listado_de_Negocios_Verdes_20251025.csv"
 )
+
+# CSV local que reemplaza a DATA_URL (permite trabajar sin conexión).
+DATA_PATH = os.environ.get("DASHBOARD_DATA_PATH") or None
+
+# Carpeta donde se guarda la instantánea del dataset ya limpio.
+SNAPSHOT_DIR = Path(os.environ.get("DASHBOARD_SNAPSHOT_DIR", BASE_DIR / ".cache" / "dataset"))
+
+# Cada cuántos segundos se revisa si la fuente cambió (0 desactiva la revisión).
+REFRESH_SECONDS = float(os.environ.get("DASHBOARD_REFRESH_SECONDS", "600"))
+
+# Procesos para leer y limpiar CSV grandes (1 = en serie; 0 = todos los núcleos).
+WORKERS = int(os.environ.get("DASHBOARD_WORKERS", "1"))
+
+# Memoria máxima (MB) de la caché de figuras de Plotly compartida por las sesiones (0 la desactiva).
+FIGURE_CACHE_MB = float(os.environ.get("DASHBOARD_FIGURE_CACHE_MB", "64"))
+
+# Artefactos precalculados con "python -m data_loader build" (dataset, cubo, agregados
+# de los gráficos y opciones de filtros). Si se define, la app solo los mapea en memoria.
+ARTIFACTS_DIR = Path(os.environ["DASHBOARD_ARTIFACTS_DIR"]) if os.environ.get("DASHBOARD_ARTIFACTS_DIR") else None
+
+
+# Archivos servidos por Streamlit en app/static/ (server.enableStaticServing).
+STATIC_DIR = BASE_DIR / "static"
+
+# Registro de tiempos por etapa (JSON lines). DASHBOARD_PROFILE_LOG="" lo desactiva.
+_PROFILE_LOG = os.environ.get("DASHBOARD_PROFILE_LOG", str(BASE_DIR / ".cache" / "perfil.jsonl"))
+PROFILE_LOG = Path(_PROFILE_LOG) if _PROFILE_LOG else None
+# Ámbitos que se escriben en PROFILE_LOG, separados por comas ("*" = todos). Por defecto solo
+# la carga; "seccion", "grafico", "fragmento" e "indices" se miden en cada interacción.
+PROFILE_SCOPES = frozenset(
+    ambito.strip() for ambito in os.environ.get("DASHBOARD_PROFILE_SCOPES", "carga").split(",") if ambito.strip()
+)
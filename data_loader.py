@@ -1,19 +1,58 @@
 from __future__ import annotations
 
-from typing import Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
+import argparse
+import io
+import multiprocessing
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
+import numpy as np
 import pandas as pd
-import streamlit as st
 
-from config import DATA_URL
+from config import ARTIFACTS_DIR, BASE_DIR, DATA_PATH, DATA_URL, SNAPSHOT_DIR, WORKERS
+from busqueda import IndiceTexto
+from instrumentacion import REGISTRO, establecer_contexto, etapa
 from dictionaries import (
     DEPARTMENT_CANONICAL,
     DEPARTMENT_COORDS,
     MAPEO_REGION,
     categorias_basura_cero,
 )
+from snapshot import (
+    HUELLA_REGLAS,
+    TABLA_CUBO,
+    TABLA_DATOS,
+    TABLA_HUELLAS,
+    VERSION_PIPELINE,
+    SnapshotInconsistente,
+    firma_fuente,
+    firmas_coinciden,
+    guardar_manifiesto,
+    guardar_snapshot,
+    hash_contenido,
+    leer_fuente,
+    leer_manifiesto,
+    leer_snapshot,
+    leer_tabla,
+)
+
+
+def transformar_unicos(serie: pd.Series, transformar: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Aplica ``transformar`` una sola vez por valor distinto y propaga el resultado.
+
+    El costo de la normalización depende de la cardinalidad de la columna y no del
+    número de filas. ``transformar`` recibe una Serie con los valores únicos
+    (incluido el nulo, si lo hay) y debe devolver una Serie del mismo largo.
+    """
+    posiciones, unicos = pd.factorize(serie, use_na_sentinel=False)
+    resultado = transformar(pd.Series(unicos, dtype=serie.dtype))
+    return resultado.take(posiciones).set_axis(serie.index).rename(serie.name)
 
 
 def normalizar_region(region: str) -> Optional[str]:
@@ -54,6 +93,28 @@ def coordenadas_departamento(nombre: Optional[str]):
     return DEPARTMENT_COORDS.get(clave)
 
 
+def clave_departamento(nombres: pd.Series) -> pd.Series:
+    """Clave de búsqueda en ``COORDENADAS_DEPARTAMENTOS`` (sin espacios extremos, en mayúsculas)."""
+    return nombres.astype(object).str.strip().str.upper()
+
+
+def _tabla_coordenadas() -> pd.DataFrame:
+    """Cada alias de DEPARTMENT_CANONICAL con coordenadas, como ``coordenadas_departamento``."""
+    alias = [clave for clave, canonico in DEPARTMENT_CANONICAL.items() if canonico in DEPARTMENT_COORDS]
+    coordenadas = [DEPARTMENT_COORDS[DEPARTMENT_CANONICAL[clave]] for clave in alias]
+    return pd.DataFrame(
+        {
+            "lat": np.array([item["lat"] for item in coordenadas], dtype=np.float64),
+            "lon": np.array([item["lon"] for item in coordenadas], dtype=np.float64),
+        },
+        index=pd.Index(alias, name="CLAVE_DEPARTAMENTO"),
+    )
+
+
+# lat/lon por clave de departamento, para unir con un join en lugar de buscar fila a fila.
+COORDENADAS_DEPARTAMENTOS = _tabla_coordenadas()
+
+
 def limpiar_numeros(texto: str) -> str:
     """Elimina numeración inicial en campos de texto (p.e. '1. SECTOR')."""
     if pd.isna(texto):
@@ -64,7 +125,7 @@ def limpiar_numeros(texto: str) -> str:
 def normalizar_sector(df: pd.DataFrame) -> pd.DataFrame:
     """Pone el sector en mayúsculas y sin espacios extremos."""
     if "SECTOR" in df.columns:
-        df["SECTOR"] = df["SECTOR"].astype(str).str.strip().str.upper()
+        df["SECTOR"] = transformar_unicos(df["SECTOR"], lambda s: s.astype(str).str.strip().str.upper())
     return df
 
 
@@ -78,6 +139,225 @@ def tipo_relacion_basura_cero(fila: pd.Series) -> str:
     return ", ".join(tipos) if tipos else "No aplica"
 
 
+# Categorías en el orden de sus bits dentro de "CÓDIGO BASURA CERO".
+CATEGORIAS_BASURA_CERO = list(categorias_basura_cero)
+COLUMNA_CODIGO_BC = "CÓDIGO BASURA CERO"
+
+
+def _tipo_codigo(categorias: int) -> np.dtype:
+    """Entero sin signo más pequeño con un bit por categoría."""
+    for tipo in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if np.iinfo(tipo).bits >= categorias:
+            return np.dtype(tipo)
+    raise ValueError(f"{categorias} categorías Basura Cero no caben en un código de 64 bits")
+
+
+# Tipo del código de bits (uint8 hasta 8 categorías, uint16 hasta 16, ...).
+TIPO_CODIGO_BC = _tipo_codigo(len(CATEGORIAS_BASURA_CERO))
+
+# Columnas auxiliares que no se muestran en la tabla ni en la descarga.
+COLUMNAS_INTERNAS = [COLUMNA_CODIGO_BC]
+
+# Dimensiones del cubo de agregados que alimenta los gráficos.
+DIMENSIONES_CUBO = [
+    "DEPARTAMENTO",
+    "REGIÓN",
+    "SECTOR",
+    "AÑO",
+    "AUTORIDAD AMBIENTAL",
+    COLUMNA_CODIGO_BC,
+]
+
+# Columnas de baja cardinalidad que se guardan como categóricas.
+COLUMNAS_CATEGORICAS = [
+    "REGIÓN",
+    "DEPARTAMENTO",
+    "SECTOR",
+    "SUBSECTOR",
+    "CATEGORÍA",
+    "AUTORIDAD AMBIENTAL",
+    "BASURA 0",
+    "RELACIÓN BASURA CERO",
+]
+
+# Texto libre: siempre como cadenas respaldadas por Arrow.
+COLUMNAS_TEXTO_LIBRE = ["DESCRIPCIÓN"]
+
+# Otras columnas de texto pasan a categóricas si tienen menos de esta proporción de valores únicos.
+UMBRAL_CATEGORICA = 0.5
+
+# Una expresión regular por categoría, compilada una sola vez.
+PATRONES_BASURA_CERO = {
+    categoria: "|".join(re.escape(p) for p in palabras)
+    for categoria, palabras in categorias_basura_cero.items()
+}
+
+
+def codigos_basura_cero(df: pd.DataFrame) -> np.ndarray:
+    """
+    Clasifica todas las filas a la vez y devuelve un código de bits por fila.
+
+    El bit ``i`` indica la ``i``-ésima categoría de ``categorias_basura_cero``. El
+    texto se arma igual que en ``tipo_relacion_basura_cero``, se deduplica y cada
+    patrón se evalúa con Arrow sobre los textos únicos.
+    """
+    texto = (
+        df["DESCRIPCIÓN"].astype(str) + " " + df["SECTOR"].astype(str) + " " + df["SUBSECTOR"].astype(str)
+    )
+    posiciones, unicos = pd.factorize(texto, use_na_sentinel=False)
+    unicos = pd.Series([t.lower() for t in unicos], dtype="string[pyarrow]")
+
+    codigos_unicos = np.zeros(len(unicos), dtype=TIPO_CODIGO_BC)
+    for bit, patron in enumerate(PATRONES_BASURA_CERO.values()):
+        coincide = unicos.str.contains(patron, regex=True).to_numpy(dtype=bool)
+        codigos_unicos |= coincide.astype(TIPO_CODIGO_BC) << bit
+    return codigos_unicos[posiciones]
+
+
+def etiquetas_basura_cero(codigos: np.ndarray) -> pd.Series:
+    """Convierte códigos de bits en el texto "Cat A, Cat B" (o "No aplica")."""
+    presentes = np.unique(codigos)
+    etiquetas = {
+        int(codigo): ", ".join(
+            c for bit, c in enumerate(CATEGORIAS_BASURA_CERO) if codigo >> bit & 1
+        ) or "No aplica"
+        for codigo in presentes
+    }
+    return pd.Series(codigos).map(etiquetas)
+
+
+def conteo_categorias(codigos, pesos=None) -> pd.Series:
+    """
+    Número de filas por categoría Basura Cero presente (incluye "No aplica").
+
+    ``pesos`` permite contar desde el cubo de agregados (una fila por combinación).
+    """
+    codigos = np.asarray(codigos, dtype=TIPO_CODIGO_BC)
+    pesos = np.ones(len(codigos), dtype=np.int64) if pesos is None else np.asarray(pesos)
+    conteo = {
+        categoria: int(pesos[(codigos & (1 << bit)) != 0].sum())
+        for bit, categoria in enumerate(CATEGORIAS_BASURA_CERO)
+    }
+    conteo["No aplica"] = int(pesos[codigos == 0].sum())
+    serie = pd.Series(conteo, dtype="int64").sort_index()
+    return serie[serie > 0]
+
+
+def _entero_minimo(serie: pd.Series) -> Optional[str]:
+    """Dtype entero más pequeño que conserva los valores (None si no aplica)."""
+    anulable = isinstance(serie.dtype, pd.api.extensions.ExtensionDtype)
+    if serie.isna().all():
+        return None
+    minimo, maximo = int(serie.min()), int(serie.max())
+    for tipo in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(tipo)
+        if info.min <= minimo and maximo <= info.max:
+            nombre = np.dtype(tipo).name
+            return nombre.capitalize() if anulable else nombre
+    return None
+
+
+def optimizar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce la memoria del dataset limpio.
+
+    Las columnas de baja cardinalidad pasan a ``category``, el texto libre a
+    ``string[pyarrow]`` y los enteros al tipo más pequeño que los contiene.
+    """
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_bool_dtype(serie.dtype):
+            continue
+        if pd.api.types.is_integer_dtype(serie.dtype):
+            tipo = _entero_minimo(serie)
+            if tipo is not None and tipo != serie.dtype.name and not pd.api.types.is_unsigned_integer_dtype(serie.dtype):
+                df[col] = serie.astype(tipo)
+        elif pd.api.types.is_string_dtype(serie.dtype):
+            if col in COLUMNAS_TEXTO_LIBRE:
+                df[col] = serie.astype("string[pyarrow]")
+            elif col in COLUMNAS_CATEGORICAS or serie.nunique() < UMBRAL_CATEGORICA * len(serie):
+                # Categorías como object (no "string"): igual que al leerlas de la instantánea.
+                df[col] = serie.astype(object).astype("category")
+            else:
+                df[col] = serie.astype("string[pyarrow]")
+    return df
+
+
+def reporte_memoria(antes: pd.DataFrame, despues: pd.DataFrame) -> pd.DataFrame:
+    """Bytes por columna antes y después de ``optimizar_tipos``."""
+    reporte = pd.DataFrame(
+        {
+            "tipo_antes": antes.dtypes.astype(str),
+            "bytes_antes": antes.memory_usage(deep=True, index=False),
+            "tipo_despues": despues.dtypes.astype(str),
+            "bytes_despues": despues.memory_usage(deep=True, index=False),
+        }
+    )
+    reporte.loc["TOTAL", ["bytes_antes", "bytes_despues"]] = reporte[["bytes_antes", "bytes_despues"]].sum()
+    reporte[["bytes_antes", "bytes_despues"]] = reporte[["bytes_antes", "bytes_despues"]].astype("int64")
+    reporte["reduccion_%"] = (1 - reporte["bytes_despues"] / reporte["bytes_antes"]) * 100
+    return reporte.round({"reduccion_%": 1})
+
+
+def construir_cubo(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cubo de conteos por DIMENSIONES_CUBO (una fila por combinación observada).
+
+    Los gráficos se calculan sobre el cubo, cuyo tamaño depende de la cantidad de
+    combinaciones distintas y no del número de registros. Los nulos se conservan
+    como una combinación más.
+    """
+    dimensiones = [col for col in DIMENSIONES_CUBO if col in df.columns]
+    if not dimensiones:
+        return pd.DataFrame({"TOTAL": [len(df)]})
+    cubo = df.groupby(dimensiones, observed=True, dropna=False, sort=False).size()
+    cubo = cubo.reset_index(name="TOTAL")
+    cubo["TOTAL"] = cubo["TOTAL"].astype(np.int32)
+    return cubo
+
+
+def _cubo_ponderado(df: pd.DataFrame, pesos: np.ndarray, dimensiones: List[str]) -> pd.DataFrame:
+    """Como ``construir_cubo`` pero cada fila suma ``pesos`` (negativo: se resta)."""
+    # Las categóricas pasan a object para combinar cubos con categorías distintas.
+    tipos = {col: object for col in dimensiones if isinstance(df[col].dtype, pd.CategoricalDtype)}
+    return df[dimensiones].astype(tipos).assign(TOTAL=pesos)
+
+
+def actualizar_cubo(
+    cubo: pd.DataFrame,
+    filas: pd.DataFrame,
+    pesos: np.ndarray,
+    tipos: Optional[pd.Series] = None,
+) -> pd.DataFrame:
+    """
+    Aplica al cubo un cambio de filas sin recontar el dataset.
+
+    ``filas`` son filas limpias y ``pesos`` cuántas veces se agregan (positivo) o se
+    quitan (negativo). Las combinaciones que quedan en cero se eliminan. ``tipos``
+    son los dtypes de las dimensiones en el dataset nuevo (p. ej. sus categorías).
+    El resultado tiene los mismos conteos que ``construir_cubo`` sobre el dataset
+    nuevo, aunque las filas pueden quedar en otro orden.
+    """
+    dimensiones = [col for col in cubo.columns if col != "TOTAL"]
+    if not dimensiones:
+        return pd.DataFrame({"TOTAL": [int(cubo["TOTAL"].sum() + pesos.sum())]}, dtype=np.int32)
+    partes = [
+        _cubo_ponderado(cubo, cubo["TOTAL"].to_numpy(), dimensiones),
+        _cubo_ponderado(filas, pesos, dimensiones),
+    ]
+    nuevo = (
+        pd.concat([parte for parte in partes if len(parte)] or partes[:1], ignore_index=True)
+        .groupby(dimensiones, dropna=False, sort=False)["TOTAL"]
+        .sum()
+        .reset_index()
+    )
+    nuevo = nuevo[nuevo["TOTAL"] > 0].reset_index(drop=True)
+    nuevo["TOTAL"] = nuevo["TOTAL"].astype(np.int32)
+    if tipos is not None:
+        nuevo = nuevo.astype({col: tipos[col] for col in dimensiones if col in tipos})
+    return nuevo
+
+
 def tiene_relacion_basura_cero(valor) -> bool:
     """Determina si un valor indica relación con Basura Cero."""
     if pd.isna(valor):
@@ -86,64 +366,544 @@ def tiene_relacion_basura_cero(valor) -> bool:
     return valor not in ["", "no aplica", "no disponible"]
 
 
-@st.cache_data(show_spinner=False)
-def load_data(dummy: int = 1) -> pd.DataFrame:
-    """Carga el dataset remoto, limpia y crea campos derivados."""
-    df = pd.read_csv(DATA_URL)
+def fuente_datos() -> str:
+    """Origen del CSV: la ruta local configurada o, si no hay, la URL remota."""
+    return DATA_PATH or DATA_URL
+
+
+def limpiar_dataset(
+    df: pd.DataFrame,
+    tiempos: Optional[Dict[str, float]] = None,
+    optimizar: bool = True,
+) -> pd.DataFrame:
+    """
+    Limpia el CSV crudo y crea los campos derivados.
+
+    Si se pasa ``tiempos``, se llena con la duración (segundos) de cada etapa.
+    Con ``optimizar=False`` se omite la etapa de tipos compactos.
+    """
+    if tiempos is None:
+        tiempos = {}
 
     # Quitar saltos de línea en nombres de columna
-    renames = {col: col.split("\n")[0] for col in df.columns if "\n" in col}
-    df = df.rename(columns=renames)
-    df.columns = df.columns.str.upper().str.strip()
+    with etapa("columnas", filas=len(df), tiempos=tiempos):
+        renames = {col: col.split("\n")[0] for col in df.columns if "\n" in col}
+        df = df.rename(columns=renames)
+        df.columns = df.columns.str.upper().str.strip()
 
     # AÑO
     if "AÑO" in df.columns:
-        df["AÑO"] = df["AÑO"].astype(str).str.replace(",", "")
-        df["AÑO"] = pd.to_numeric(df["AÑO"], errors="coerce").astype("Int64")
+        with etapa("año", filas=len(df), tiempos=tiempos):
+            df["AÑO"] = transformar_unicos(
+                df["AÑO"],
+                lambda s: pd.to_numeric(s.astype(str).str.replace(",", ""), errors="coerce").astype("Int64"),
+            )
 
     # AUTORIDAD AMBIENTAL
     if "AUTORIDAD AMBIENTAL" in df.columns:
-        df["AUTORIDAD AMBIENTAL"] = df["AUTORIDAD AMBIENTAL"].astype("string").str.strip().str.upper()
+        with etapa("autoridad", filas=len(df), tiempos=tiempos):
+            df["AUTORIDAD AMBIENTAL"] = transformar_unicos(
+                df["AUTORIDAD AMBIENTAL"], lambda s: s.astype("string").str.strip().str.upper()
+            )
 
     # REGIÓN (normalizada + relleno por autoridad ambiental)
     if "REGIÓN" in df.columns:
-        df["REGIÓN"] = df["REGIÓN"].astype("string").map(normalizar_region)
-
-        def asignar_region(row):
-            region = row["REGIÓN"]
-            if pd.isna(region) or str(region).lower() == "no registra":
-                return MAPEO_REGION.get(row["AUTORIDAD AMBIENTAL"], region)
-            return region
-
-        df["REGIÓN"] = df.apply(asignar_region, axis=1)
-        df["REGIÓN"] = df["REGIÓN"].map(normalizar_region)
+        with etapa("region", filas=len(df), tiempos=tiempos):
+            region = transformar_unicos(df["REGIÓN"], lambda s: s.astype("string").map(normalizar_region))
+            if "AUTORIDAD AMBIENTAL" in df.columns:
+                sin_region = region.isna() | transformar_unicos(
+                    region, lambda s: s.astype(str).str.lower() == "no registra"
+                )
+                relleno = transformar_unicos(
+                    df["AUTORIDAD AMBIENTAL"], lambda s: s.map(MAPEO_REGION).astype(object)
+                )
+                region = region.where(~(sin_region & relleno.notna()), relleno)
+            df["REGIÓN"] = transformar_unicos(region, lambda s: s.map(normalizar_region))
 
     # DEPARTAMENTO
     if "DEPARTAMENTO" in df.columns:
-        df["DEPARTAMENTO"] = df["DEPARTAMENTO"].astype("string").map(normalizar_departamento)
+        with etapa("departamento", filas=len(df), tiempos=tiempos):
+            df["DEPARTAMENTO"] = transformar_unicos(
+                df["DEPARTAMENTO"], lambda s: s.astype("string").map(normalizar_departamento)
+            )
 
     # Quitar numeración de categoría, sector, subsector
-    for col in ["CATEGORÍA", "SECTOR", "SUBSECTOR"]:
-        if col in df.columns:
-            df[col] = df[col].apply(limpiar_numeros)
+    with etapa("numeracion", filas=len(df), tiempos=tiempos):
+        for col in ["CATEGORÍA", "SECTOR", "SUBSECTOR"]:
+            if col in df.columns:
+                df[col] = transformar_unicos(df[col], lambda s: s.map(limpiar_numeros))
 
     # Normalizar sector a mayúsculas
-    df = normalizar_sector(df)
+    with etapa("sector", filas=len(df), tiempos=tiempos):
+        df = normalizar_sector(df)
 
     # Ajuste de PRODUCTO PRINCIPAL
     if "PRODUCTO PRINCIPAL" in df.columns:
-        df["PRODUCTO PRINCIPAL"] = df["PRODUCTO PRINCIPAL"].astype(str).str.upper()
-        df["PRODUCTO PRINCIPAL"] = df["PRODUCTO PRINCIPAL"].str.replace(".", "", regex=False)
-        df["PRODUCTO PRINCIPAL"] = df["PRODUCTO PRINCIPAL"].replace({"MIEL": "MIEL DE ABEJAS"})
-
-    # Campo RELACIÓN BASURA CERO
+        with etapa("producto", filas=len(df), tiempos=tiempos):
+            df["PRODUCTO PRINCIPAL"] = transformar_unicos(
+                df["PRODUCTO PRINCIPAL"],
+                lambda s: (
+                    s.astype(str)
+                    .str.upper()
+                    .str.replace(".", "", regex=False)
+                    .replace({"MIEL": "MIEL DE ABEJAS"})
+                ),
+            )
+
+    # Campo RELACIÓN BASURA CERO (+ código de bits por categoría)
     if all(col in df.columns for col in ["DESCRIPCIÓN", "SECTOR", "SUBSECTOR"]):
-        df["RELACIÓN BASURA CERO"] = df.apply(tipo_relacion_basura_cero, axis=1)
+        with etapa("clasificacion", filas=len(df), tiempos=tiempos):
+            codigos = codigos_basura_cero(df)
+            df["RELACIÓN BASURA CERO"] = etiquetas_basura_cero(codigos).to_numpy(dtype=object)
 
-    # Campo BASURA 0 (Sí/No)
-    if "RELACIÓN BASURA CERO" in df.columns:
-        df["BASURA 0"] = df["RELACIÓN BASURA CERO"].apply(
-            lambda x: "Sí" if pd.notna(x) and str(x).strip() != "" and str(x).lower() != "no aplica" else "No"
-        )
+            # Campo BASURA 0 (Sí/No): alguna categoría identificada
+            df["BASURA 0"] = np.where(codigos > 0, "Sí", "No").astype(object)
+            df[COLUMNA_CODIGO_BC] = codigos
+
+    # Tipos compactos (categóricas, texto Arrow y enteros reducidos)
+    if optimizar:
+        with etapa("tipos", filas=len(df), tiempos=tiempos):
+            df = optimizar_tipos(df)
 
     return df
+
+
+def version_dataset(digest: str) -> str:
+    """Identificador de versión: hash del contenido fuente + versión del pipeline y de sus diccionarios."""
+    return f"{digest[:12]}.{VERSION_PIPELINE}.{HUELLA_REGLAS[:8]}"
+
+
+# Por debajo de estas filas arrancar los procesos (importar pandas en cada uno)
+# cuesta más de lo que ahorra repartir la limpieza.
+FILAS_MINIMAS_PARALELO = 500_000
+
+
+def numero_trabajadores(trabajadores: Optional[int] = None) -> int:
+    """Procesos a usar: ``trabajadores`` o ``WORKERS``; 0 significa todos los núcleos."""
+    trabajadores = WORKERS if trabajadores is None else trabajadores
+    return trabajadores if trabajadores > 0 else os.cpu_count() or 1
+
+
+def _igual_que_motor_c(serie: pd.Series) -> bool:
+    """Si el lector de Arrow dejó la columna como el motor C (sin fechas ni otros objetos)."""
+    if serie.dtype == object:
+        return pd.api.types.infer_dtype(serie, skipna=True) in ("string", "empty")
+    return serie.dtype.kind in "biuf"
+
+
+def leer_csv(contenido: bytes, paralelo: bool = False) -> pd.DataFrame:
+    """
+    Lee el CSV crudo.
+
+    En paralelo se usa el lector multihilo de Arrow. Como Arrow infiere algunos tipos
+    que el motor C deja como texto (p. ej. fechas), si alguna columna no queda igual
+    que en la lectura en serie se vuelve a leer con el motor C.
+    """
+    if paralelo:
+        df = pd.read_csv(io.BytesIO(contenido), engine="pyarrow")
+        if all(_igual_que_motor_c(df[col]) for col in df.columns):
+            return df
+    return pd.read_csv(io.BytesIO(contenido))
+
+
+def _iniciar_trabajador() -> None:
+    # Solo el proceso principal escribe el historial de tiempos.
+    REGISTRO.archivo = None
+
+
+def _limpiar_particion(df: pd.DataFrame) -> pd.DataFrame:
+    return limpiar_dataset(df, optimizar=False)
+
+
+def limpiar_en_paralelo(
+    df: pd.DataFrame, trabajadores: int, tiempos: Optional[Dict[str, float]] = None
+) -> pd.DataFrame:
+    """
+    ``limpiar_dataset`` repartido en ``trabajadores`` procesos.
+
+    Todas las etapas salvo los tipos compactos son fila a fila: cada proceso limpia un
+    bloque contiguo de filas, los bloques se concatenan en su orden original y los
+    tipos se calculan sobre el total, así que el resultado es idéntico al de
+    ``limpiar_dataset``. Si no se pueden crear los procesos, se limpia en serie.
+    """
+    if tiempos is None:
+        tiempos = {}
+    limites = np.linspace(0, len(df), min(trabajadores, len(df)) + 1).astype(int)
+    bloques = [df.iloc[inicio:fin] for inicio, fin in zip(limites[:-1], limites[1:])]
+    try:
+        with etapa("limpieza_paralela", filas=len(df), tiempos=tiempos):
+            # "spawn": hacer fork de un servidor con hilos (Streamlit) puede bloquearse.
+            with ProcessPoolExecutor(
+                max_workers=len(bloques),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_iniciar_trabajador,
+            ) as pool:
+                limpio = pd.concat(pool.map(_limpiar_particion, bloques))
+    except (OSError, BrokenProcessPool):
+        return limpiar_dataset(df, tiempos)
+    with etapa("tipos", filas=len(limpio), tiempos=tiempos):
+        return optimizar_tipos(limpio)
+
+
+class Procesado(NamedTuple):
+    """Una versión de la fuente ya procesada, con las huellas de sus filas crudas."""
+
+    frame: pd.DataFrame
+    cubo: pd.DataFrame
+    huellas: np.ndarray
+    columnas: Dict[str, str]
+
+
+def huellas_filas(crudo: pd.DataFrame) -> np.ndarray:
+    """Hash (uint64) de cada fila cruda, con todas sus columnas."""
+    return pd.util.hash_pandas_object(crudo, index=False).to_numpy()
+
+
+def columnas_fuente(crudo: pd.DataFrame) -> Dict[str, str]:
+    """Columnas crudas y sus tipos: si cambian, las huellas no son comparables."""
+    return {col: str(tipo) for col, tipo in crudo.dtypes.items()}
+
+
+def _tipos_sin_optimizar(df: pd.DataFrame) -> pd.DataFrame:
+    """Categóricas y texto como object, para que ``optimizar_tipos`` las recalcule."""
+    tipos = {
+        col: object
+        for col, tipo in df.dtypes.items()
+        if isinstance(tipo, (pd.CategoricalDtype, pd.StringDtype))
+    }
+    return df.astype(tipos)
+
+
+def procesar_cambios(
+    crudo: pd.DataFrame,
+    huellas: np.ndarray,
+    anterior: Procesado,
+    tiempos: Optional[Dict[str, float]] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Limpia solo las filas nuevas o modificadas respecto de ``anterior``.
+
+    Las filas cuya huella ya existía se toman ya limpias de la versión anterior (la
+    limpieza y la clasificación son fila a fila); las que desaparecieron no se
+    copian. El cubo se corrige con la diferencia de filas en lugar de recontarse y
+    los tipos compactos se recalculan sobre el total, así que el dataset es idéntico
+    al de limpiar todo de nuevo.
+    """
+    if tiempos is None:
+        tiempos = {}
+    unicas, primera, inversa, conteo = np.unique(huellas, return_index=True, return_inverse=True, return_counts=True)
+    unicas_ant, primera_ant, conteo_ant = np.unique(anterior.huellas, return_index=True, return_counts=True)
+    # Huellas de cada versión presentes en la otra (búsqueda sobre huellas ordenadas).
+    pos = np.minimum(np.searchsorted(unicas_ant, unicas), max(len(unicas_ant) - 1, 0))
+    existia = unicas_ant[pos] == unicas if len(unicas_ant) else np.zeros(len(unicas), dtype=bool)
+    pos_ant = np.minimum(np.searchsorted(unicas, unicas_ant), max(len(unicas) - 1, 0))
+    sigue = unicas[pos_ant] == unicas_ant if len(unicas) else np.zeros(len(unicas_ant), dtype=bool)
+
+    # Para cada fila nueva, una fila anterior con la misma huella (o -1).
+    previas = np.where(existia, primera_ant[pos], -1)[inversa]
+    nuevas = previas < 0
+    with etapa("limpieza_incremental", filas=int(nuevas.sum()), tiempos=tiempos):
+        partes = [_tipos_sin_optimizar(anterior.frame.take(previas[~nuevas]))]
+        if nuevas.any():
+            # Sin filas reutilizadas, concat con una tabla vacía alteraría los tipos.
+            partes = partes[:int((~nuevas).any())] + [limpiar_dataset(crudo[nuevas], optimizar=False)]
+        # Filas reutilizadas y luego nuevas -> orden de la fuente.
+        orden = np.argsort(np.concatenate([np.flatnonzero(~nuevas), np.flatnonzero(nuevas)]), kind="stable")
+        df = pd.concat(partes, ignore_index=True).take(orden).reset_index(drop=True)
+    with etapa("tipos", filas=len(df), tiempos=tiempos):
+        df = optimizar_tipos(df)
+
+    # Diferencia de conteos por huella: positiva si hay más copias, negativa si menos.
+    with etapa("cubo_incremental", filas=len(anterior.cubo), tiempos=tiempos) as e:
+        diferencia = conteo - np.where(existia, conteo_ant[pos], 0)
+        cambia = diferencia != 0
+        filas = [df.take(primera[cambia]), anterior.frame.take(primera_ant[~sigue])]
+        filas = pd.concat([parte for parte in filas if len(parte)] or filas[:1], ignore_index=True)
+        pesos = np.concatenate([diferencia[cambia], -conteo_ant[~sigue]])
+        cubo = actualizar_cubo(anterior.cubo, filas, pesos, df.dtypes)
+        e.filas_salida = len(cubo)
+    return df, cubo
+
+
+def procesar_contenido(
+    contenido: bytes,
+    tiempos: Optional[Dict[str, float]] = None,
+    trabajadores: Optional[int] = None,
+    anterior: Optional[Procesado] = None,
+) -> Procesado:
+    """
+    Lee el CSV crudo, lo limpia y arma el cubo de agregados.
+
+    Con más de un trabajador (``WORKERS`` por defecto) la lectura usa Arrow multihilo
+    y, si el archivo es grande, la limpieza se reparte entre procesos. Con
+    ``anterior`` (y las mismas columnas crudas) solo se procesan las filas que cambiaron.
+    """
+    trabajadores = numero_trabajadores(trabajadores)
+    with etapa("lectura", tiempos=tiempos) as e:
+        crudo = leer_csv(contenido, paralelo=trabajadores > 1)
+        e.filas_salida = len(crudo)
+    columnas = columnas_fuente(crudo)
+    with etapa("huellas", filas=len(crudo), tiempos=tiempos):
+        huellas = huellas_filas(crudo)
+    if anterior is not None and anterior.columnas == columnas:
+        return Procesado(*procesar_cambios(crudo, huellas, anterior, tiempos), huellas, columnas)
+    if trabajadores > 1 and len(crudo) >= FILAS_MINIMAS_PARALELO:
+        df = limpiar_en_paralelo(crudo, trabajadores, tiempos)
+    else:
+        df = limpiar_dataset(crudo, tiempos)
+    with etapa("cubo", filas=len(df), tiempos=tiempos) as e:
+        cubo = construir_cubo(df)
+        e.filas_salida = len(cubo)
+    return Procesado(df, cubo, huellas, columnas)
+
+
+def leer_procesado(carpeta: Path, manifiesto: Dict[str, Any]) -> Optional[Procesado]:
+    """La versión guardada en la instantánea, con sus huellas (None si no las tiene)."""
+    if "columnas_fuente" not in manifiesto:
+        return None
+    try:
+        return Procesado(
+            leer_snapshot(carpeta, TABLA_DATOS, manifiesto=manifiesto),
+            leer_snapshot(carpeta, TABLA_CUBO, manifiesto=manifiesto),
+            leer_snapshot(carpeta, TABLA_HUELLAS, manifiesto=manifiesto)["HUELLA"].to_numpy(),
+            manifiesto["columnas_fuente"],
+        )
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def cargar_datos(
+    version_actual: Optional[str] = None, usar_snapshot: bool = True
+) -> Optional[Tuple[pd.DataFrame, pd.DataFrame, str]]:
+    """
+    Carga el dataset limpio y devuelve ``(df, cubo, version)``.
+
+    Si la instantánea local corresponde a la versión actual de la fuente se lee
+    directamente de disco; si no, se descarga el CSV, se limpia, se arma el cubo de
+    agregados y se guarda una nueva instantánea. Sin conexión se usa la última
+    instantánea disponible.
+
+    Con ``version_actual`` (la versión que ya se tiene en memoria) devuelve None si
+    la fuente sigue en esa versión, sin leer la instantánea. Si las tablas de la
+    instantánea no corresponden a su manifiesto (una escritura cortada a mitad de
+    camino), se ignora y se procesa la fuente completa.
+    """
+    origen = fuente_datos()
+    previa = leer_manifiesto(SNAPSHOT_DIR) if usar_snapshot else None
+    if previa is not None and previa.get("origen") != origen:
+        previa = None
+
+    def desde_snapshot(digest: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame, str]]:
+        if version_dataset(digest) == version_actual:
+            return None
+        establecer_contexto(version=version_dataset(digest))
+        try:
+            with etapa("snapshot") as e:
+                df = leer_snapshot(SNAPSHOT_DIR, TABLA_DATOS, manifiesto=previa)
+                cubo = leer_snapshot(SNAPSHOT_DIR, TABLA_CUBO, manifiesto=previa)
+                e.filas_salida = len(df)
+        except SnapshotInconsistente:
+            return cargar_datos(version_actual, usar_snapshot=False)
+        return df, cubo, version_dataset(digest)
+
+    try:
+        firma = firma_fuente(origen)
+    except OSError:
+        firma = None
+        if previa is not None:
+            return desde_snapshot(previa["hash"])
+
+    if previa is not None and firmas_coinciden(previa.get("firma"), firma):
+        return desde_snapshot(previa["hash"])
+
+    with etapa("descarga"):
+        contenido = leer_fuente(origen)
+    digest = hash_contenido(contenido)
+    if previa is not None and previa.get("hash") == digest:
+        # Mismo contenido con otra firma (p. ej. archivo tocado): solo se actualiza la firma.
+        guardar_manifiesto(SNAPSHOT_DIR, {**previa, "firma": firma})
+        return desde_snapshot(digest)
+
+    establecer_contexto(version=version_dataset(digest))
+    tiempos: Dict[str, float] = {}
+    # Con la versión anterior guardada solo se limpian las filas que cambiaron.
+    anterior = leer_procesado(SNAPSHOT_DIR, previa) if previa is not None else None
+    procesado = procesar_contenido(contenido, tiempos, anterior=anterior)
+    df, cubo = procesado.frame, procesado.cubo
+    guardar_snapshot(
+        SNAPSHOT_DIR,
+        {TABLA_DATOS: df, TABLA_CUBO: cubo, TABLA_HUELLAS: pd.DataFrame({"HUELLA": procesado.huellas})},
+        {
+            "origen": origen,
+            "hash": digest,
+            "firma": firma,
+            "filas": len(df),
+            "tiempos": tiempos,
+            "columnas_fuente": procesado.columnas,
+        },
+    )
+    return df, cubo, version_dataset(digest)
+
+
+def load_data() -> pd.DataFrame:
+    """Carga el dataset limpio (ver ``cargar_datos``)."""
+    return cargar_datos()[0]
+
+
+# Tablas de agregados de los gráficos dentro de los artefactos ("agregado_mapa.feather", ...).
+PREFIJO_AGREGADO = "agregado_"
+# Tablas del índice de texto dentro de los artefactos ("busqueda_vocabulario.feather", ...).
+PREFIJO_BUSQUEDA = "busqueda_"
+
+
+class Artefactos(NamedTuple):
+    """Todo lo que la app necesita, leído de los artefactos de ``construir_artefactos``."""
+
+    frame: pd.DataFrame
+    cubo: pd.DataFrame
+    version: str
+    agregados: Dict[str, Optional[pd.DataFrame]]
+    opciones_filtros: Tuple[List[str], List[str], List[str]]
+    # None en artefactos armados antes de guardar el índice: se arma al cargar.
+    busqueda: Optional[IndiceTexto] = None
+
+
+def construir_artefactos(origen: str, carpeta: Path, trabajadores: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Corre el pipeline completo fuera de la app y guarda sus resultados en ``carpeta``.
+
+    Escribe el dataset limpio, el cubo, los agregados de cada gráfico y el índice de
+    texto como Feather sin comprimir (para mapearlos en memoria) y un manifiesto con
+    el hash de la fuente, los tiempos por etapa y las opciones de los filtros.
+    Devuelve el manifiesto.
+    """
+    # agregados.py importa este módulo: se importa aquí para evitar el ciclo.
+    from agregados import calcular_agregados, opciones_filtros
+
+    with etapa("descarga"):
+        contenido = leer_fuente(origen)
+    digest = hash_contenido(contenido)
+    establecer_contexto(version=version_dataset(digest))
+    tiempos: Dict[str, float] = {}
+    procesado = procesar_contenido(contenido, tiempos, trabajadores)
+    df, cubo = procesado.frame, procesado.cubo
+    with etapa("agregados", filas=len(cubo), tiempos=tiempos):
+        agregados = calcular_agregados(cubo)
+        regiones, sectores, categorias = opciones_filtros(df)
+    with etapa("busqueda", filas=len(df), tiempos=tiempos):
+        busqueda = IndiceTexto(df)
+        tablas_busqueda = busqueda.tablas()
+
+    tablas = {TABLA_DATOS: df, TABLA_CUBO: cubo}
+    tablas.update(
+        {PREFIJO_AGREGADO + nombre: tabla for nombre, tabla in agregados.items() if tabla is not None}
+    )
+    tablas.update({PREFIJO_BUSQUEDA + nombre: tabla for nombre, tabla in tablas_busqueda.items()})
+    manifiesto = {
+        "origen": origen,
+        "hash": digest,
+        "filas": len(df),
+        "tiempos": tiempos,
+        # Nombre -> si hay tabla (False: el gráfico no aplica a estos datos).
+        "agregados": {nombre: tabla is not None for nombre, tabla in agregados.items()},
+        "opciones_filtros": {"regiones": regiones, "sectores": sectores, "categorias": categorias},
+        "busqueda": {"campos": busqueda.campos, "tablas": list(tablas_busqueda)},
+    }
+    if not guardar_snapshot(carpeta, tablas, manifiesto, compresion="uncompressed"):
+        raise ValueError("El dataset limpio no se puede guardar en formato Arrow")
+    return manifiesto
+
+
+def _manifiesto_artefactos(carpeta: Path) -> Optional[Dict[str, Any]]:
+    manifiesto = leer_manifiesto(carpeta)
+    if manifiesto is None or "opciones_filtros" not in manifiesto:
+        return None
+    return manifiesto
+
+
+def hay_artefactos(carpeta: Path) -> bool:
+    """Si ``carpeta`` tiene artefactos válidos para esta versión del pipeline."""
+    return _manifiesto_artefactos(carpeta) is not None
+
+
+def cargar_artefactos(carpeta: Path, version_actual: Optional[str] = None) -> Optional[Artefactos]:
+    """
+    Mapea en memoria los artefactos de ``construir_artefactos``.
+
+    Devuelve None si la carpeta no tiene artefactos válidos (ver ``hay_artefactos``)
+    o si son de ``version_actual``. Lanza ``SnapshotInconsistente`` si alguna tabla no
+    tiene las filas que registra el manifiesto.
+    """
+    manifiesto = _manifiesto_artefactos(carpeta)
+    if manifiesto is None:
+        return None
+
+    version = version_dataset(manifiesto["hash"])
+    if version == version_actual:
+        return None
+    establecer_contexto(version=version)
+    with etapa("artefactos") as e:
+        df = leer_snapshot(carpeta, TABLA_DATOS, memory_map=True, manifiesto=manifiesto)
+        cubo = leer_snapshot(carpeta, TABLA_CUBO, memory_map=True, manifiesto=manifiesto)
+        agregados = {
+            nombre: (
+                leer_snapshot(carpeta, PREFIJO_AGREGADO + nombre, memory_map=True, manifiesto=manifiesto)
+                if presente
+                else None
+            )
+            for nombre, presente in manifiesto["agregados"].items()
+        }
+        e.filas_salida = len(df)
+    busqueda = None
+    if "busqueda" in manifiesto:
+        with etapa("busqueda_artefactos", ambito="indices", filas=len(df)):
+            busqueda = IndiceTexto.desde_tablas(
+                len(df),
+                manifiesto["busqueda"]["campos"],
+                {
+                    nombre: leer_tabla(carpeta, PREFIJO_BUSQUEDA + nombre, memory_map=True, manifiesto=manifiesto)
+                    for nombre in manifiesto["busqueda"]["tablas"]
+                },
+            )
+    opciones = manifiesto["opciones_filtros"]
+    return Artefactos(
+        df,
+        cubo,
+        version,
+        agregados,
+        (opciones["regiones"], opciones["sectores"], opciones["categorias"]),
+        busqueda,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m data_loader",
+        description="Procesamiento del listado de Negocios Verdes fuera de la app.",
+    )
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    build = comandos.add_parser(
+        "build", help="Precalcula el dataset, los agregados y los filtros para DASHBOARD_ARTIFACTS_DIR"
+    )
+    build.add_argument("--input", help="CSV local o URL (por defecto, la fuente configurada)")
+    build.add_argument(
+        "--out",
+        type=Path,
+        default=ARTIFACTS_DIR or BASE_DIR / "artifacts",
+        help="Carpeta de salida (por defecto DASHBOARD_ARTIFACTS_DIR o artifacts/)",
+    )
+    build.add_argument(
+        "--workers",
+        type=int,
+        help="Procesos para leer y limpiar (por defecto DASHBOARD_WORKERS; 0 = todos los núcleos)",
+    )
+    args = parser.parse_args(argv)
+
+    manifiesto = construir_artefactos(args.input or fuente_datos(), args.out, args.workers)
+    print(f"{manifiesto['filas']:,} filas -> {args.out}")
+    for nombre, segundos in manifiesto["tiempos"].items():
+        print(f"  {nombre:<14}{segundos * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
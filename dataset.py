@@ -0,0 +1,273 @@
+"""
+Dataset compartido por todas las sesiones del proceso.
+
+``st.cache_data`` devuelve una copia deserializada del DataFrame en cada llamada
+y obliga a hashear el DataFrame cuando se pasa como argumento. Aquí se guarda una
+única instancia por proceso con ``st.cache_resource`` y las cachés derivadas se
+indexan por ``Dataset.version`` en lugar del contenido del DataFrame.
+
+Un hilo revisa la fuente cada ``REFRESH_SECONDS`` y, si cambió, prepara la nueva
+versión fuera de los reruns y la publica de una vez; mientras tanto las sesiones
+siguen usando la anterior.
+
+Si ``DASHBOARD_ARTIFACTS_DIR`` apunta a artefactos de ``python -m data_loader build``,
+el dataset, el cubo, los agregados de los gráficos y las opciones de filtros se
+mapean en memoria desde ahí y la app no procesa el CSV.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Optional
+
+import logging
+import os
+import threading
+import weakref
+
+import pandas as pd
+import streamlit as st
+
+from agregados import AGREGADOS, Filtros, OpcionesFiltros, filtros_aplicables, opciones_filtros
+from config import ARTIFACTS_DIR, REFRESH_SECONDS
+from data_loader import cargar_artefactos, cargar_datos, hay_artefactos
+from busqueda import IndiceTexto
+from indices import IndiceFiltros
+from instrumentacion import etapa
+
+logger = logging.getLogger(__name__)
+
+# Hilos para calcular los agregados de Inicio a la vez (uno por núcleo, como máximo
+# uno por agregado). pandas y numpy liberan el GIL en los groupby y las sumas.
+HILOS_AGREGADOS = min(len(AGREGADOS), os.cpu_count() or 1)
+_POOL_AGREGADOS = ThreadPoolExecutor(max_workers=HILOS_AGREGADOS, thread_name_prefix="agregados")
+
+
+@dataclass(frozen=True, eq=False)
+class Dataset:
+    """
+    Dataset limpio de solo lectura, su cubo de agregados y su versión.
+
+    ``frame`` y ``cubo`` se comparten entre sesiones: no deben modificarse en el
+    lugar. Quien necesite cambiarlos debe trabajar sobre una copia.
+    """
+
+    frame: pd.DataFrame
+    cubo: pd.DataFrame
+    version: str
+    # Precalculados en los artefactos; lo que falte se calcula al primer uso.
+    agregados_guardados: Optional[Dict[str, Optional[pd.DataFrame]]] = None
+    opciones_guardadas: Optional[OpcionesFiltros] = None
+    busqueda_guardada: Optional[IndiceTexto] = None
+
+    @cached_property
+    def agregados(self) -> Dict[str, Optional[pd.DataFrame]]:
+        """Tabla de cada gráfico sobre el cubo completo (ver ``agregados.AGREGADOS``)."""
+        guardados = self.agregados_guardados or {}
+        with etapa("agregados", ambito="indices", filas=len(self.cubo)):
+            return {
+                nombre: guardados[nombre] if nombre in guardados else funcion(self.cubo)
+                for nombre, funcion in AGREGADOS.items()
+            }
+
+    @cached_property
+    def opciones_filtros(self) -> OpcionesFiltros:
+        """Opciones de los filtros de la tabla: regiones, sectores y categorías."""
+        if self.opciones_guardadas is not None:
+            return self.opciones_guardadas
+        return opciones_filtros(self.frame)
+
+    @cached_property
+    def indice_cubo(self) -> IndiceFiltros:
+        """Índice de bitmaps sobre las filas del cubo, para filtrar los gráficos."""
+        with etapa("indice_cubo", ambito="indices", filas=len(self.cubo)):
+            return IndiceFiltros(self.cubo)
+
+    def cubo_filtrado(self, filtros: Filtros) -> pd.DataFrame:
+        """Filas del cubo que cumplen ``filtros`` (el mismo cubo si no hay filtros)."""
+        if not any(filtros):
+            return self.cubo
+        return _cubo_filtrado(self, self.version, filtros)
+
+    def agregado(self, nombre: str, filtros: Filtros = Filtros()) -> Optional[pd.DataFrame]:
+        """Tabla del gráfico ``nombre`` con los filtros que le corresponden."""
+        filtros = filtros_aplicables(nombre, filtros)
+        if not any(filtros):
+            return self.agregados[nombre]
+        return _agregado_filtrado(self, self.version, nombre, filtros)
+
+    def agregados_filtrados(
+        self, filtros: Filtros, paralelo: bool = HILOS_AGREGADOS > 1
+    ) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Tabla de cada gráfico con ``filtros``, en el orden de ``AGREGADOS``.
+
+        Primero se filtra el cubo una vez por cada combinación distinta de filtros
+        aplicables (a lo sumo tres: todos, sin sectores, sin categorías); después
+        los agregados que no estén en memoria se calculan sobre esos cubos, en
+        paralelo en ``HILOS_AGREGADOS`` hilos si ``paralelo``. El resultado se devuelve
+        completo, así los gráficos se dibujan en orden.
+        """
+        if not any(filtros):
+            return self.agregados
+        aplicables = {nombre: filtros_aplicables(nombre, filtros) for nombre in AGREGADOS}
+        for filtro in dict.fromkeys(aplicables.values()):
+            if any(filtro):
+                self.cubo_filtrado(filtro)
+            else:
+                self.agregados
+        if not paralelo:
+            return {nombre: self.agregado(nombre, filtros) for nombre in AGREGADOS}
+        futuros = {nombre: _POOL_AGREGADOS.submit(self.agregado, nombre, filtros) for nombre in AGREGADOS}
+        return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+    @cached_property
+    def indice(self) -> IndiceFiltros:
+        """Índice de bitmaps para los filtros (se arma al primer uso)."""
+        with etapa("indice_filtros", ambito="indices", filas=len(self.frame)):
+            return IndiceFiltros(self.frame)
+
+    @cached_property
+    def busqueda(self) -> IndiceTexto:
+        """Índice invertido para la búsqueda de texto (mapeado de los artefactos, si está)."""
+        if self.busqueda_guardada is not None:
+            return self.busqueda_guardada
+        with etapa("busqueda", ambito="indices", filas=len(self.frame)):
+            return IndiceTexto(self.frame)
+
+
+# Memorizados por versión y filtros, compartidos entre sesiones: volver a una
+# selección (o que otra sesión la use) no recalcula nada. Con un filtro nuevo solo se
+# recalculan los agregados a los que ese filtro afecta.
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cubo_filtrado(_dataset: Dataset, version: str, filtros: Filtros) -> pd.DataFrame:
+    with etapa("cubo_filtrado", ambito="indices", filas=len(_dataset.cubo)) as e:
+        cubo = _dataset.indice_cubo.filtrar(_dataset.cubo, *filtros)
+        e.filas_salida = len(cubo)
+    return cubo
+
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def _agregado_filtrado(_dataset: Dataset, version: str, nombre: str, filtros: Filtros) -> Optional[pd.DataFrame]:
+    cubo = _dataset.cubo_filtrado(filtros)
+    with etapa(f"agregado_{nombre}", ambito="indices", filas=len(cubo)):
+        return AGREGADOS[nombre](cubo)
+
+
+def cargar_dataset(version_actual: Optional[str] = None) -> Optional[Dataset]:
+    """
+    Carga el dataset (de los artefactos o de la fuente) con el índice de texto listo.
+
+    Con ``version_actual`` devuelve None si la fuente sigue en esa versión.
+    """
+    if ARTIFACTS_DIR is not None and hay_artefactos(ARTIFACTS_DIR):
+        artefactos = cargar_artefactos(ARTIFACTS_DIR, version_actual)
+        if artefactos is None:
+            return None
+        dataset = Dataset(
+            frame=artefactos.frame,
+            cubo=artefactos.cubo,
+            version=artefactos.version,
+            agregados_guardados=artefactos.agregados,
+            opciones_guardadas=artefactos.opciones_filtros,
+            busqueda_guardada=artefactos.busqueda,
+        )
+    else:
+        datos = cargar_datos(version_actual)
+        if datos is None:
+            return None
+        df, cubo, version = datos
+        dataset = Dataset(frame=df, cubo=cubo, version=version)
+    dataset.busqueda  # el índice de texto se arma junto con la carga
+    return dataset
+
+
+class Actualizador:
+    """
+    Dataset vigente del proceso y su revalidación en segundo plano.
+
+    ``obtener`` devuelve siempre el dataset vigente sin esperar: la versión nueva se
+    arma en el hilo de revalidación y se publica reemplazando ``actual``. Un solo
+    lock serializa las cargas, así que los arranques en frío concurrentes esperan la
+    misma descarga y limpieza en lugar de repetirla.
+
+    El hilo solo guarda una referencia débil al actualizador: cuando se libera (p. ej.
+    al limpiar la caché de ``obtener_actualizador``) se llama a ``detener`` y el hilo
+    termina.
+    """
+
+    def __init__(self, intervalo: float = REFRESH_SECONDS):
+        self.intervalo = intervalo
+        self.actual: Optional[Dataset] = None
+        self._carga = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        weakref.finalize(self, self._detener.set)
+
+    def obtener(self) -> Dataset:
+        """Dataset vigente; la primera llamada lo carga y arranca la revalidación."""
+        actual = self.actual
+        if actual is not None:
+            return actual
+        with self._carga:
+            if self.actual is None:
+                self.actual = cargar_dataset()
+                self._iniciar_revalidacion()
+            return self.actual
+
+    def revalidar(self) -> bool:
+        """Revisa la fuente y publica la versión nueva si cambió (devuelve si cambió)."""
+        with self._carga:
+            nuevo = cargar_dataset(self.actual.version if self.actual is not None else None)
+            if nuevo is None:
+                return False
+            self.actual = nuevo
+            return True
+
+    def detener(self) -> None:
+        """Detiene el hilo de revalidación."""
+        self._detener.set()
+
+    def _iniciar_revalidacion(self) -> None:
+        if self.intervalo > 0 and self._hilo is None:
+            self._hilo = threading.Thread(
+                target=_revalidar_periodicamente,
+                args=(weakref.ref(self), self._detener, self.intervalo),
+                name="revalidar-dataset",
+                daemon=True,
+            )
+            self._hilo.start()
+
+
+def _revalidar_periodicamente(
+    referencia: "weakref.ref[Actualizador]", detener: threading.Event, intervalo: float
+) -> None:
+    while not detener.wait(intervalo):
+        actualizador = referencia()
+        if actualizador is None:
+            return
+        try:
+            with etapa("revalidacion"):
+                actualizador.revalidar()
+        except Exception:
+            # Sin conexión o con una fuente inválida se sigue sirviendo la versión vigente;
+            # el error queda en el log y en el panel ?debug=1.
+            logger.exception("No se pudo revalidar el dataset")
+        del actualizador
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_actualizador() -> Actualizador:
+    """Actualizador único del proceso."""
+    return Actualizador()
+
+
+def obtener_dataset() -> Dataset:
+    """Dataset vigente, compartido por todas las sesiones del proceso."""
+    actualizador = obtener_actualizador()
+    if actualizador.actual is not None:
+        return actualizador.actual
+    with st.spinner("Cargando datos…"):
+        return actualizador.obtener()
@@ -0,0 +1,151 @@
+"""
+Exportación del listado en varios formatos.
+
+Los bytes se generan solo cuando el usuario pide la descarga. Los de la base
+completa se comparten entre sesiones con ``st.cache_resource`` por versión del
+dataset y formato; los de un resultado filtrado no se comparten (cada combinación de
+filtros y búsqueda fijaría otro archivo en memoria): la sesión guarda solo el último
+que pidió, para que los reruns no vuelvan a serializarlo.
+La escritura se hace por bloques de filas directamente sobre un buffer binario,
+sin construir un único string con todo el archivo.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Optional, Sequence, Tuple
+
+import gzip
+import importlib.util
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+FILAS_POR_BLOQUE = 50_000
+
+
+@dataclass(frozen=True)
+class Formato:
+    etiqueta: str
+    extension: str
+    mime: str
+
+
+FORMATOS: Dict[str, Formato] = {
+    "csv": Formato("CSV", "csv", "text/csv"),
+    "csv.gz": Formato("CSV comprimido (gzip)", "csv.gz", "application/gzip"),
+    "parquet": Formato("Parquet", "parquet", "application/vnd.apache.parquet"),
+}
+# Excel solo si el motor está instalado (dependencia opcional).
+if importlib.util.find_spec("openpyxl") is not None:
+    FORMATOS["xlsx"] = Formato(
+        "Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+
+def _bloques(df: pd.DataFrame, columnas: Optional[Sequence[str]], filas_por_bloque: int):
+    """Bloques consecutivos de filas (solo con ``columnas``, si se indican)."""
+    for inicio in range(0, max(len(df), 1), filas_por_bloque):
+        bloque = df.iloc[inicio : inicio + filas_por_bloque]
+        yield inicio, bloque if columnas is None else bloque[list(columnas)]
+
+
+def escribir_csv(
+    df: pd.DataFrame,
+    destino: BinaryIO,
+    columnas: Optional[Sequence[str]] = None,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+) -> None:
+    """Escribe ``df`` como CSV UTF-8 en ``destino``, un bloque de filas a la vez."""
+    for inicio, bloque in _bloques(df, columnas, filas_por_bloque):
+        bloque.to_csv(destino, index=False, header=inicio == 0, encoding="utf-8")
+
+
+def escribir_parquet(
+    df: pd.DataFrame,
+    destino: BinaryIO,
+    columnas: Optional[Sequence[str]] = None,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+) -> None:
+    """Escribe ``df`` como Parquet, un row group por bloque de filas."""
+    esquema = None
+    escritor = None
+    try:
+        for _, bloque in _bloques(df, columnas, filas_por_bloque):
+            if escritor is None:
+                esquema = pa.Schema.from_pandas(bloque, preserve_index=False)
+                escritor = pq.ParquetWriter(destino, esquema)
+            escritor.write_table(pa.Table.from_pandas(bloque, schema=esquema, preserve_index=False))
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def serializar(
+    df: pd.DataFrame,
+    formato: str,
+    columnas: Optional[Sequence[str]] = None,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+) -> bytes:
+    """Bytes de ``df`` en el formato pedido (clave de ``FORMATOS``)."""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+    buffer = io.BytesIO()
+    if formato == "csv":
+        escribir_csv(df, buffer, columnas, filas_por_bloque)
+    elif formato == "csv.gz":
+        with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6) as comprimido:
+            escribir_csv(df, comprimido, columnas, filas_por_bloque)
+    elif formato == "parquet":
+        escribir_parquet(df, buffer, columnas, filas_por_bloque)
+    else:
+        df.to_excel(buffer, index=False, columns=columnas, engine="openpyxl")
+    return buffer.getvalue()
+
+
+# Una entrada por formato, y margen para la versión anterior mientras se reemplaza.
+@st.cache_resource(show_spinner="Preparando descarga…", max_entries=2 * len(FORMATOS))
+def _exportar_completo(_df: pd.DataFrame, version: str, formato: str, columnas: Tuple[str, ...]) -> bytes:
+    return serializar(_df, formato, columnas)
+
+
+# Clave de ``st.session_state`` con la última exportación filtrada de la sesión.
+_ULTIMA_FILTRADA = "_exportacion_filtrada"
+
+
+def exportar(
+    df: pd.DataFrame,
+    version: str,
+    formato: str,
+    columnas: Tuple[str, ...],
+    filtros: Tuple = (),
+) -> bytes:
+    """
+    Bytes de exportación por versión, formato, columnas y filtros.
+
+    ``df`` no se hashea: ``version`` y ``filtros`` deben identificar su contenido.
+    Sin filtros (base completa) los bytes se comparten entre sesiones; con filtros
+    solo se recuerda la última exportación de la sesión.
+    """
+    if not filtros:
+        return _exportar_completo(df, version, formato, columnas)
+    clave = (version, formato, columnas, filtros)
+    ultima = st.session_state.get(_ULTIMA_FILTRADA)
+    if ultima is not None and ultima[0] == clave:
+        return ultima[1]
+    st.session_state.pop(_ULTIMA_FILTRADA, None)  # libera la anterior antes de armar la nueva
+    with st.spinner("Preparando descarga…"):
+        datos = serializar(df, formato, columnas)
+    st.session_state[_ULTIMA_FILTRADA] = (clave, datos)
+    return datos
+
+
+def nombre_archivo(base: str, formato: str) -> str:
+    return f"{base}.{FORMATOS[formato].extension}"
+
+
+def formatos_disponibles() -> Sequence[str]:
+    return list(FORMATOS)
@@ -1,46 +1,28 @@
-from __future__ import annotations
+"""
+Gráficos del dashboard.
 
-import pandas as pd
-import plotly.express as px
-import streamlit as st
+Cada función recibe la tabla ya agregada que dibuja (ver ``agregados.py``; en la
+app, ``Dataset.agregados``) y solo arma la figura. Si la tabla es None el gráfico
+no aplica y no se muestra nada.
 
-from data_loader import coordenadas_departamento, tiene_relacion_basura_cero
+Con ``clave`` (versión del dataset y filtros que le aplican al gráfico) la figura se
+toma de ``cache_figuras.CACHE_FIGURAS`` en lugar de armarse de nuevo.
+"""
 
+from __future__ import annotations
 
-def plot_mapa_basura_cero_por_departamento(df: pd.DataFrame) -> None:
-    """Mapa interactivo con intensidad de alineación Basura Cero por departamento."""
-    if df.empty or not {"DEPARTAMENTO", "RELACIÓN BASURA CERO"}.issubset(df.columns):
-        return
-
-    mapa_df = df.copy()
-    relacion_normalizada = (
-        mapa_df["RELACIÓN BASURA CERO"].fillna("").astype(str).str.strip().str.lower()
-    )
-    mapa_df["TIENE_RELACION"] = ~relacion_normalizada.isin({"", "no aplica", "no disponible"})
+from typing import Hashable, Optional
 
-    resumen_departamentos = (
-        mapa_df.groupby("DEPARTAMENTO")
-        .agg(TOTAL=("DEPARTAMENTO", "size"), ALINEADOS=("TIENE_RELACION", "sum"))
-        .reset_index()
-    )
-    if resumen_departamentos.empty:
-        return
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
 
-    resumen_departamentos["ALINEADOS"] = resumen_departamentos["ALINEADOS"].astype(int)
-    resumen_departamentos["PORCENTAJE"] = (
-        resumen_departamentos["ALINEADOS"] / resumen_departamentos["TOTAL"] * 100
-    ).round(1)
-    resumen_departamentos["COORDS"] = resumen_departamentos["DEPARTAMENTO"].apply(
-        coordenadas_departamento
-    )
-    resumen_departamentos = resumen_departamentos.dropna(subset=["COORDS"])
-    if resumen_departamentos.empty:
-        return
+from cache_figuras import figura
+from instrumentacion import medir
 
-    resumen_departamentos["lat"] = resumen_departamentos["COORDS"].apply(lambda item: item["lat"])
-    resumen_departamentos["lon"] = resumen_departamentos["COORDS"].apply(lambda item: item["lon"])
 
-    st.markdown("### 🗺️ Mapa interactivo: intensidad Basura Cero por departamento")
+def _figura_mapa(resumen_departamentos: pd.DataFrame) -> go.Figure:
     fig_map = px.scatter_mapbox(
         resumen_departamentos,
         lat="lat",
@@ -65,6 +47,19 @@ def plot_mapa_basura_cero_por_departamento(df: pd.DataFrame) -> None:
         margin={"l": 0, "r": 0, "t": 0, "b": 0},
         coloraxis_colorbar={"title": "% alineadas"},
     )
+    return fig_map
+
+
+@medir("grafico")
+def plot_mapa_basura_cero_por_departamento(
+    resumen_departamentos: Optional[pd.DataFrame], clave: Optional[Hashable] = None
+) -> None:
+    """Mapa interactivo con intensidad de alineación Basura Cero por departamento."""
+    if resumen_departamentos is None:
+        return
+
+    st.markdown("### 🗺️ Mapa interactivo: intensidad Basura Cero por departamento")
+    fig_map = figura(clave, "mapa", lambda: _figura_mapa(resumen_departamentos))
     st.plotly_chart(fig_map, use_container_width=True)
     st.caption(
         "El tamaño del marcador refleja el total de negocios verdes en el departamento y el color indica el "
@@ -72,16 +67,7 @@ def plot_mapa_basura_cero_por_departamento(df: pd.DataFrame) -> None:
     )
 
 
-def plot_top_sectores(df: pd.DataFrame) -> None:
-    """Top 10 sectores con más negocios verdes (barra horizontal interactiva)."""
-    if df.empty or "SECTOR" not in df.columns or df["SECTOR"].isna().all():
-        return
-
-    st.markdown("### 🌿 Top 10 Sectores con más Negocios Verdes")
-    top_sectores = (
-        df["SECTOR"].value_counts().head(10).rename_axis("SECTOR").reset_index(name="Total")
-    )
-
+def _figura_top_sectores(top_sectores: pd.DataFrame) -> go.Figure:
     fig = px.bar(
         top_sectores.sort_values("Total"),
         x="Total",
@@ -98,20 +84,21 @@ def plot_top_sectores(df: pd.DataFrame) -> None:
         margin=dict(l=10, r=10, t=40, b=10),
         coloraxis_showscale=False,
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_tendencia_anual(df: pd.DataFrame) -> None:
-    """Línea de tiempo de número de negocios verdes por año."""
-    if "AÑO" not in df.columns:
+@medir("grafico")
+def plot_top_sectores(top_sectores: Optional[pd.DataFrame], clave: Optional[Hashable] = None) -> None:
+    """Top 10 sectores con más negocios verdes (barra horizontal interactiva)."""
+    if top_sectores is None:
         return
 
-    st.markdown("### 📈 Tendencia anual de negocios verdes")
-    df_anual = df.dropna(subset=["AÑO"])
-    if df_anual.empty:
-        return
+    st.markdown("### 🌿 Top 10 Sectores con más Negocios Verdes")
+    fig = figura(clave, "top_sectores", lambda: _figura_top_sectores(top_sectores))
+    st.plotly_chart(fig, use_container_width=True)
 
-    conteo = df_anual.groupby("AÑO").size().reset_index(name="Total")
+
+def _figura_tendencia(conteo: pd.DataFrame) -> go.Figure:
     fig = px.line(
         conteo,
         x="AÑO",
@@ -120,41 +107,24 @@ def plot_tendencia_anual(df: pd.DataFrame) -> None:
         labels={"AÑO": "Año", "Total": "Número de registros"},
     )
     fig.update_layout(margin=dict(l=10, r=10, t=40, b=10))
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def plot_relacion_basura_cero(df: pd.DataFrame) -> None:
-    """Resumen de iniciativas alineadas o no con Basura Cero + categorías."""
-    if df.empty or "RELACIÓN BASURA CERO" not in df.columns:
+@medir("grafico")
+def plot_tendencia_anual(conteo: Optional[pd.DataFrame], clave: Optional[Hashable] = None) -> None:
+    """Línea de tiempo de número de negocios verdes por año."""
+    if conteo is None:
         return
 
-    st.markdown("### ♻️ Relación con el programa Basura Cero")
-    st.markdown(
-        """
-        La siguiente clasificación busca identificar cómo cada iniciativa se conecta con los pilares del
-        programa **Basura Cero**. Se analizan palabras clave en la descripción, sector y subsector para
-        agrupar los proyectos según su enfoque.
-        """
-    )
+    st.markdown("### 📈 Tendencia anual de negocios verdes")
+    if conteo.empty:
+        return
 
-    resumen_relacion = (
-        df["RELACIÓN BASURA CERO"]
-        .fillna("No aplica")
-        .apply(
-            lambda valor: (
-                "Iniciativas alineadas"
-                if str(valor).strip().lower() not in {"no aplica", "no disponible", ""}
-                else "Sin relación identificada"
-            )
-        )
-        .value_counts()
-        .rename_axis("Relación")
-        .reset_index(name="Total")
-    )
+    fig = figura(clave, "tendencia", lambda: _figura_tendencia(conteo))
+    st.plotly_chart(fig, use_container_width=True)
 
-    if resumen_relacion.empty:
-        return
 
+def _figura_relacion(resumen_relacion: pd.DataFrame) -> go.Figure:
     fig_relacion = px.pie(
         resumen_relacion,
         names="Relación",
@@ -175,62 +145,62 @@ def plot_relacion_basura_cero(df: pd.DataFrame) -> None:
         textposition="inside",
     )
     fig_relacion.update_layout(margin=dict(l=0, r=0, t=30, b=0))
-    st.plotly_chart(fig_relacion, use_container_width=True)
+    return fig_relacion
 
-    # Barras por categoría
-    relacion_series = (
-        df["RELACIÓN BASURA CERO"].fillna("No aplica").str.get_dummies(sep=", ").sum().sort_values(ascending=False)
+
+def _figura_categorias(categorias: pd.DataFrame) -> go.Figure:
+    fig_cat = px.bar(
+        categorias.sort_values("Total"),
+        x="Total",
+        y="Categoría",
+        orientation="h",
+        text="Total",
+        color="Total",
+        color_continuous_scale="Greens",
     )
-    if not relacion_series.empty:
-        st.markdown("#### Distribución general por categoría Basura Cero")
-        data = relacion_series.rename_axis("Categoría").reset_index(name="Total")
-        fig_cat = px.bar(
-            data.sort_values("Total"),
-            x="Total",
-            y="Categoría",
-            orientation="h",
-            text="Total",
-            color="Total",
-            color_continuous_scale="Greens",
-        )
-        fig_cat.update_traces(textposition="outside")
-        fig_cat.update_layout(
-            xaxis_title="Número de iniciativas",
-            yaxis_title="Categoría Basura Cero",
-            margin=dict(l=10, r=10, t=40, b=10),
-            coloraxis_showscale=False,
-        )
-        st.plotly_chart(fig_cat, use_container_width=True)
+    fig_cat.update_traces(textposition="outside")
+    fig_cat.update_layout(
+        xaxis_title="Número de iniciativas",
+        yaxis_title="Categoría Basura Cero",
+        margin=dict(l=10, r=10, t=40, b=10),
+        coloraxis_showscale=False,
+    )
+    return fig_cat
 
 
-def plot_autoridades(df: pd.DataFrame) -> None:
-    """Barras interactivas con las autoridades ambientales con más registros."""
-    if df.empty or "AUTORIDAD AMBIENTAL" not in df.columns:
+@medir("grafico")
+def plot_relacion_basura_cero(
+    resumen_relacion: Optional[pd.DataFrame],
+    categorias: Optional[pd.DataFrame] = None,
+    clave: Optional[Hashable] = None,
+) -> None:
+    """Resumen de iniciativas alineadas o no con Basura Cero + categorías."""
+    if resumen_relacion is None:
         return
 
-    st.markdown("### 🏛️ Autoridades ambientales y Basura Cero")
+    st.markdown("### ♻️ Relación con el programa Basura Cero")
     st.markdown(
         """
-        Conoce qué tan activa está cada autoridad ambiental en el programa y cómo se distribuyen
-        las iniciativas con relación identificada a **Basura Cero**.
+        La siguiente clasificación busca identificar cómo cada iniciativa se conecta con los pilares del
+        programa **Basura Cero**. Se analizan palabras clave en la descripción, sector y subsector para
+        agrupar los proyectos según su enfoque.
         """
     )
 
-    autoridades_norm = (
-        df["AUTORIDAD AMBIENTAL"].fillna("No registra").astype(str).str.strip().replace("", "No registra")
-    )
+    if resumen_relacion.empty:
+        return
 
-    top_autoridades = (
-        autoridades_norm.value_counts()
-        .head(15)
-        .reset_index(name="Total")
-        .rename(columns={"index": "AUTORIDAD AMBIENTAL"})
-    )
-    top_autoridades = top_autoridades.sort_values("Total")
+    fig_relacion = figura(clave, "relacion", lambda: _figura_relacion(resumen_relacion))
+    st.plotly_chart(fig_relacion, use_container_width=True)
+
+    # Barras por categoría
+    if categorias is not None and not categorias.empty:
+        st.markdown("#### Distribución general por categoría Basura Cero")
+        fig_cat = figura(clave, "categorias", lambda: _figura_categorias(categorias))
+        st.plotly_chart(fig_cat, use_container_width=True)
 
-    if top_autoridades.empty:
-        return
 
+def _figura_autoridades(top_autoridades: pd.DataFrame) -> go.Figure:
     fig_aut = px.bar(
         top_autoridades,
         x="Total",
@@ -250,4 +220,25 @@ def plot_autoridades(df: pd.DataFrame) -> None:
         yaxis_title="Autoridad ambiental",
         margin=dict(l=0, r=30, t=30, b=0),
     )
-    st.plotly_chart(fig_aut, use_container_width=True)
+    return fig_aut
+
+
+@medir("grafico")
+def plot_autoridades(top_autoridades: Optional[pd.DataFrame], clave: Optional[Hashable] = None) -> None:
+    """Barras interactivas con las autoridades ambientales con más registros."""
+    if top_autoridades is None:
+        return
+
+    st.markdown("### 🏛️ Autoridades ambientales y Basura Cero")
+    st.markdown(
+        """
+        Conoce qué tan activa está cada autoridad ambiental en el programa y cómo se distribuyen
+        las iniciativas con relación identificada a **Basura Cero**.
+        """
+    )
+
+    if top_autoridades.empty:
+        return
+
+    fig = figura(clave, "autoridades", lambda: _figura_autoridades(top_autoridades))
+    st.plotly_chart(fig, use_container_width=True)
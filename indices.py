@@ -0,0 +1,93 @@
+"""
+Índice de bitmaps para los filtros de la tabla de Inicio.
+
+Se construye una vez por versión del dataset: un bitmap empaquetado (``np.packbits``)
+por cada región, sector y categoría Basura Cero. Filtrar es hacer OR dentro de cada
+filtro y AND entre filtros, y luego un único ``take`` sobre el DataFrame.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CATEGORIAS_BASURA_CERO, COLUMNA_CODIGO_BC, TIPO_CODIGO_BC
+
+
+def _bitmaps_por_valor(serie: pd.Series) -> Dict[str, np.ndarray]:
+    """Un bitmap empaquetado por cada valor no nulo de la columna."""
+    codigos, valores = pd.factorize(serie, sort=True)
+    return {valor: np.packbits(codigos == i) for i, valor in enumerate(valores)}
+
+
+class IndiceFiltros:
+    """Bitmaps por región, sector y categoría Basura Cero de un dataset."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.filas = len(df)
+        self.regiones = _bitmaps_por_valor(df["REGIÓN"]) if "REGIÓN" in df.columns else {}
+        self.sectores = _bitmaps_por_valor(df["SECTOR"]) if "SECTOR" in df.columns else {}
+        self.categorias: Dict[str, np.ndarray] = {}
+        if COLUMNA_CODIGO_BC in df.columns:
+            codigos = df[COLUMNA_CODIGO_BC].to_numpy(dtype=TIPO_CODIGO_BC)
+            self.categorias = {
+                categoria: np.packbits((codigos & (1 << bit)) != 0)
+                for bit, categoria in enumerate(CATEGORIAS_BASURA_CERO)
+            }
+
+    def _union(self, bitmaps: Dict[str, np.ndarray], seleccion: Iterable[str]) -> np.ndarray:
+        """OR de los bitmaps seleccionados (vacío si ninguno existe)."""
+        resultado = np.zeros((self.filas + 7) // 8, dtype=np.uint8)
+        for valor in seleccion:
+            bitmap = bitmaps.get(valor)
+            if bitmap is not None:
+                resultado |= bitmap
+        return resultado
+
+    def mascara(
+        self,
+        regiones: Iterable[str] = (),
+        sectores: Iterable[str] = (),
+        categorias: Iterable[str] = (),
+    ) -> Optional[np.ndarray]:
+        """
+        Máscara booleana de las filas que cumplen todos los filtros activos.
+
+        Devuelve None si no hay filtros activos (todas las filas).
+        """
+        combinado = None
+        for bitmaps, seleccion in (
+            (self.regiones, list(regiones)),
+            (self.sectores, list(sectores)),
+            (self.categorias, list(categorias)),
+        ):
+            if not seleccion:
+                continue
+            union = self._union(bitmaps, seleccion)
+            combinado = union if combinado is None else combinado & union
+        if combinado is None:
+            return None
+        return np.unpackbits(combinado, count=self.filas).view(bool)
+
+    def filtrar(
+        self,
+        df: pd.DataFrame,
+        regiones: Iterable[str] = (),
+        sectores: Iterable[str] = (),
+        categorias: Iterable[str] = (),
+        adicional: Optional[np.ndarray] = None,
+    ) -> pd.DataFrame:
+        """
+        Filas de ``df`` que cumplen los filtros (el mismo objeto si no hay filtros).
+
+        ``adicional`` es otra máscara booleana (p. ej. la de la búsqueda de texto)
+        que se combina con AND.
+        """
+        mascara = self.mascara(regiones, sectores, categorias)
+        if adicional is not None:
+            mascara = adicional if mascara is None else mascara & adicional
+        if mascara is None:
+            return df
+        return df.take(np.flatnonzero(mascara))
@@ -0,0 +1,168 @@
+"""
+Instrumentación por etapas: duración, filas de entrada/salida y variación de memoria.
+
+Cada medición se guarda en un registro del proceso (la última por etapa, para el
+panel de depuración). Las de los ámbitos de ``PROFILE_SCOPES`` (por defecto solo la
+carga) se agregan además como una línea JSON a ``PROFILE_LOG``, de modo que se
+pueden comparar los tiempos entre versiones de los datos.
+
+    with etapa("region", filas=len(df), tiempos=tiempos) as e:
+        ...
+        e.filas_salida = len(df)
+
+    @medir("grafico")
+    def plot_algo(cubo): ...
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import json
+import os
+import threading
+import time
+
+from config import PROFILE_LOG, PROFILE_SCOPES
+
+_PAGINA_MB = os.sysconf("SC_PAGE_SIZE") / 2**20 if hasattr(os, "sysconf") else None
+
+
+def memoria_rss_mb() -> Optional[float]:
+    """Memoria residente del proceso en MB (None si no se puede leer)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * _PAGINA_MB
+    except (OSError, TypeError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class Medicion:
+    """Resultado de una etapa medida."""
+
+    ambito: str
+    nombre: str
+    segundos: float
+    filas_entrada: Optional[int] = None
+    filas_salida: Optional[int] = None
+    memoria_mb: Optional[float] = None
+    marca: float = field(default_factory=time.time)
+    contexto: Dict[str, Any] = field(default_factory=dict)
+    # Excepción con la que terminó la etapa (None si terminó bien).
+    error: Optional[str] = None
+
+
+class Registro:
+    """
+    Últimas mediciones por etapa y archivo JSON lines con el historial.
+
+    Solo se escriben en el archivo las mediciones de ``ambitos`` ("*" = todos): las de
+    cada interacción (secciones, gráficos, fragmentos) quedan solo en memoria salvo
+    que se pidan, para no escribir en disco en cada rerun.
+    """
+
+    def __init__(self, archivo: Optional[Path], ambitos: Iterable[str] = ("carga",)):
+        self.archivo = archivo
+        self.ambitos = frozenset(ambitos)
+        self.contexto: Dict[str, Any] = {}
+        self._ultimas: Dict[Tuple[str, str], Medicion] = {}
+        self._lock = threading.Lock()
+
+    def agregar(self, medicion: Medicion) -> None:
+        medicion.contexto = {**self.contexto, **medicion.contexto}
+        with self._lock:
+            self._ultimas[(medicion.ambito, medicion.nombre)] = medicion
+            if self.archivo is None or not ("*" in self.ambitos or medicion.ambito in self.ambitos):
+                return
+            try:
+                self.archivo.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.archivo, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(asdict(medicion), ensure_ascii=False, default=str) + "\n")
+            except OSError:
+                # El registro en disco es opcional: no debe romper la app.
+                self.archivo = None
+
+    def ultimas(self) -> List[Medicion]:
+        """Última medición de cada etapa, en orden de registro."""
+        with self._lock:
+            return list(self._ultimas.values())
+
+
+REGISTRO = Registro(PROFILE_LOG, PROFILE_SCOPES)
+
+
+def establecer_contexto(**valores: Any) -> None:
+    """Campos (p. ej. ``version``) que se añaden a todas las mediciones siguientes."""
+    REGISTRO.contexto.update(valores)
+
+
+@dataclass
+class _EtapaEnCurso:
+    filas_salida: Optional[int] = None
+
+
+@contextmanager
+def etapa(
+    nombre: str,
+    ambito: str = "carga",
+    filas: Optional[int] = None,
+    tiempos: Optional[Dict[str, float]] = None,
+) -> Iterator[_EtapaEnCurso]:
+    """
+    Mide una etapa. ``filas`` son las filas de entrada; la salida se toma de
+    ``e.filas_salida`` si se asigna (si no, se asume igual a la entrada).
+
+    Si se pasa ``tiempos``, también se guarda ahí la duración en segundos. Si la
+    etapa lanza una excepción, la medición se registra igual con el error.
+    """
+    en_curso = _EtapaEnCurso()
+    memoria_inicial = memoria_rss_mb()
+    inicio = time.perf_counter()
+    error = None
+    try:
+        yield en_curso
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        segundos = time.perf_counter() - inicio
+        memoria_final = memoria_rss_mb()
+        if tiempos is not None:
+            tiempos[nombre] = segundos
+        REGISTRO.agregar(
+            Medicion(
+                ambito=ambito,
+                nombre=nombre,
+                segundos=segundos,
+                filas_entrada=filas,
+                filas_salida=en_curso.filas_salida if en_curso.filas_salida is not None else filas,
+                memoria_mb=(
+                    memoria_final - memoria_inicial
+                    if memoria_inicial is not None and memoria_final is not None
+                    else None
+                ),
+                error=error,
+            )
+        )
+
+
+def medir(ambito: str, nombre: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorador: mide cada llamada; las filas de entrada son las del primer argumento."""
+
+    def decorador(funcion: Callable) -> Callable:
+        etiqueta = nombre or funcion.__name__
+
+        @wraps(funcion)
+        def envoltura(*args: Any, **kwargs: Any) -> Any:
+            filas = len(args[0]) if args and hasattr(args[0], "__len__") else None
+            with etapa(etiqueta, ambito, filas=filas):
+                return funcion(*args, **kwargs)
+
+        return envoltura
+
+    return decorador
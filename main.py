@@ -1,20 +1,57 @@
 from __future__ import annotations
 
-import streamlit as st
+from typing import Callable, Dict, NamedTuple
 
-# Carga de datos
-from data_loader import load_data
+import importlib
 
-# Secciones del dashboard
-from sections.home import render_home
-from sections.mapa import render_mapa
-from sections.faq import render_faq
-from sections.insights import render_insights
-from sections.basura_cero import render_basura_cero
-from sections.historias import render_historias   # ⬅️ NUEVO
+import streamlit as st
 
 # Utilidades
-from utils import load_css
+from instrumentacion import etapa
+from utils import contar_ejecucion, load_css, nueva_interaccion, render_panel_depuracion
+
+
+class Seccion(NamedTuple):
+    """Sección del dashboard: módulo y función que la dibujan, y si necesita el dataset."""
+
+    modulo: str
+    funcion: str
+    usa_datos: bool = False
+
+
+# Registro de secciones. Los módulos se importan (con plotly, pandas, etc.) la primera
+# vez que se visita la sección, y el dataset solo se carga para las que lo usan.
+SECCIONES: Dict[str, Seccion] = {
+    "Inicio": Seccion("sections.home", "render_home", usa_datos=True),
+    "Mapa del sitio": Seccion("sections.mapa", "render_mapa"),
+    "Preguntas frecuentes": Seccion("sections.faq", "render_faq"),
+    "Insights": Seccion("sections.insights", "render_insights", usa_datos=True),
+    "Basura Cero": Seccion("sections.basura_cero", "render_basura_cero"),
+    "Historias Reales": Seccion("sections.historias", "render_historias"),
+}
+
+
+def obtener_render(seccion: Seccion) -> Callable[..., None]:
+    """Importa (solo la primera vez) el módulo de la sección y devuelve su función."""
+    return getattr(importlib.import_module(seccion.modulo), seccion.funcion)
+
+
+def render_seccion(nombre: str) -> None:
+    """Dibuja la sección ``nombre``, cargando el dataset solo si la sección lo usa."""
+    seccion = SECCIONES[nombre]
+    with etapa(f"importar {seccion.modulo}", ambito="seccion"):
+        render = obtener_render(seccion)
+    if seccion.usa_datos:
+        # Dataset compartido (una sola instancia por proceso)
+        from dataset import obtener_dataset
+
+        with etapa("obtener_dataset", ambito="seccion"):
+            dataset = obtener_dataset()
+        with etapa(nombre, ambito="seccion", filas=len(dataset.frame)):
+            render(dataset)
+    else:
+        with etapa(nombre, ambito="seccion"):
+            render()
 
 
 def main() -> None:
@@ -24,27 +61,21 @@ def main() -> None:
         layout="centered",
         page_icon="♻️",
     )
+    # Un rerun completo es una interacción nueva (los de fragmentos se cuentan aparte).
+    nueva_interaccion()
+    contar_ejecucion("app")
 
     # CSS personalizado
     load_css()
 
-    # Cargar dataset
-    df = load_data()
-
     # Sidebar de navegación
     st.sidebar.header("Navegación")
 
     section = st.sidebar.radio(
         "Selecciona una sección",
-        (
-            "Inicio",
-            "Mapa del sitio",
-            "Preguntas frecuentes",
-            "Insights",
-            "Basura Cero",
-            "Historias Reales",       # ⬅️ NUEVO
-        ),
+        tuple(SECCIONES),
         index=0,
+        key="seccion",
     )
 
     st.sidebar.markdown(
@@ -56,23 +87,11 @@ def main() -> None:
     )
 
     # Router de vistas
-    if section == "Inicio":
-        render_home(df)
-
-    elif section == "Mapa del sitio":
-        render_mapa()
-
-    elif section == "Preguntas frecuentes":
-        render_faq()
-
-    elif section == "Insights":
-        render_insights(df)
-
-    elif section == "Basura Cero":
-        render_basura_cero()
+    render_seccion(section)
 
-    elif section == "Historias Reales":
-        render_historias()   # ⬅️ NUEVO
+    # Panel de tiempos por etapa (oculto; se activa con ?debug=1 en la URL)
+    if st.query_params.get("debug") == "1":
+        render_panel_depuracion()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+"""
+Derivados optimizados de las imágenes de ``assets/img``.
+
+Las imágenes originales pesan entre 1 y 3 MB. Aquí se generan, una sola vez por
+contenido, versiones WebP redimensionadas dentro de ``static/img`` (servidas por
+Streamlit en ``app/static/...`` cuando ``server.enableStaticServing`` está activo).
+El nombre de cada derivado incluye un hash del original y de los parámetros, así
+que un cambio en la imagen produce un archivo nuevo y el navegador puede cachearlos
+sin riesgo.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import base64
+import hashlib
+import os
+import tempfile
+
+import streamlit as st
+from PIL import Image
+
+from config import STATIC_DIR
+
+CARPETA_DERIVADOS = STATIC_DIR / "img"
+URL_ESTATICA = "app/static"
+CALIDAD_WEBP = 80
+# Anchos de las variantes responsivas: el contenido mide como máximo 1000 px
+# (layout "centered"), así que 2000 cubre pantallas de alta densidad.
+ANCHOS_RESPONSIVOS = (480, 800, 1000, 1500, 2000)
+
+
+def servicio_estatico_activo() -> bool:
+    """Indica si Streamlit sirve la carpeta ``static/`` (``server.enableStaticServing``)."""
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except RuntimeError:
+        return False
+
+
+def huella_imagen(contenido: bytes, *parametros: object) -> str:
+    """Hash corto del contenido de la imagen original y de los parámetros del derivado."""
+    digest = hashlib.sha256(contenido)
+    digest.update(repr(parametros).encode("utf-8"))
+    return digest.hexdigest()[:10]
+
+
+def _nombre_derivado(origen: Path, contenido: bytes, ancho: int, calidad: int) -> str:
+    return f"{origen.stem}-{ancho}w-{huella_imagen(contenido, ancho, calidad)}.webp"
+
+
+def _guardar_webp(imagen: Image.Image, ancho: int, calidad: int, ruta: Path) -> None:
+    """Redimensiona ``imagen`` a ``ancho`` como máximo y la guarda en WebP (escritura atómica)."""
+    if imagen.width > ancho:
+        alto = round(imagen.height * ancho / imagen.width)
+        imagen = imagen.resize((ancho, alto), Image.LANCZOS)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=ruta.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            imagen.save(f, format="WEBP", quality=calidad, method=6)
+        os.chmod(temporal, 0o644)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+def _abrir(origen: Path, ancho: int) -> Image.Image:
+    """Abre ``origen`` listo para reducir a ``ancho`` (los JPEG se decodifican ya reducidos)."""
+    imagen = Image.open(origen)
+    imagen.draft("RGB", (ancho, round(imagen.height * ancho / imagen.width)))
+    return imagen.convert("RGBA" if "A" in imagen.getbands() else "RGB")
+
+
+def derivar_imagen(
+    origen: Path,
+    ancho: int,
+    calidad: int = CALIDAD_WEBP,
+    carpeta: Path = CARPETA_DERIVADOS,
+) -> Path:
+    """
+    Devuelve la ruta de una versión WebP de ``origen`` de ``ancho`` píxeles como máximo.
+
+    El archivo se genera solo si todavía no existe (escritura atómica).
+    """
+    origen = Path(origen)
+    ruta = carpeta / _nombre_derivado(origen, origen.read_bytes(), ancho, calidad)
+    if not ruta.exists():
+        _guardar_webp(_abrir(origen, ancho), ancho, calidad, ruta)
+    return ruta
+
+
+def variantes_imagen(
+    origen: Path,
+    anchos: Sequence[int] = ANCHOS_RESPONSIVOS,
+    calidad: int = CALIDAD_WEBP,
+    carpeta: Path = CARPETA_DERIVADOS,
+) -> List[Tuple[int, Path]]:
+    """
+    Derivados WebP de ``origen`` para cada ancho (sin ampliar más allá del original).
+
+    Devuelve pares (ancho real, ruta) ordenados de menor a mayor. La imagen se decodifica
+    una sola vez y solo si falta algún derivado.
+    """
+    origen = Path(origen)
+    with Image.open(origen) as imagen:
+        ancho_original, alto_original = imagen.size
+    anchos = sorted({min(ancho, ancho_original) for ancho in anchos})
+
+    contenido = origen.read_bytes()
+    rutas = [carpeta / _nombre_derivado(origen, contenido, ancho, calidad) for ancho in anchos]
+    faltantes = [(a, r) for a, r in zip(anchos, rutas) if not r.exists()]
+    if faltantes:
+        imagen = _abrir(origen, max(a for a, _ in faltantes))
+        for ancho, ruta in reversed(faltantes):
+            _guardar_webp(imagen, ancho, calidad, ruta)
+    return list(zip(anchos, rutas))
+
+
+def url_estatica(ruta: Path) -> str:
+    """URL relativa con la que Streamlit sirve un archivo de ``static/``."""
+    return f"{URL_ESTATICA}/{Path(ruta).relative_to(STATIC_DIR).as_posix()}"
+
+
+def data_uri(ruta: Path) -> str:
+    """Imagen embebida en base64 (respaldo cuando no hay servicio estático)."""
+    ruta = Path(ruta)
+    subtipo = {".jpg": "jpeg", ".jpeg": "jpeg"}.get(ruta.suffix.lower(), ruta.suffix.lower().lstrip("."))
+    return f"data:image/{subtipo};base64,{base64.b64encode(ruta.read_bytes()).decode('ascii')}"
+
+
+def url_imagen(origen: Path, ancho: int, estatico: Optional[bool] = None) -> str:
+    """
+    URL para usar ``origen`` en CSS/HTML a un ancho dado.
+
+    Usa el derivado WebP servido como estático; si el servicio estático está apagado
+    lo embebe en base64, y si no se puede generar el derivado, embebe el original.
+    """
+    if estatico is None:
+        estatico = servicio_estatico_activo()
+    try:
+        derivado = derivar_imagen(origen, ancho)
+    except OSError:
+        return data_uri(origen)
+    return url_estatica(derivado) if estatico else data_uri(derivado)
+
+
+def srcset(variantes: Sequence[Tuple[int, Path]]) -> str:
+    """Atributo ``srcset`` (``url ancho``w) a partir de las variantes."""
+    return ", ".join(f"{url_estatica(ruta)} {ancho}w" for ancho, ruta in variantes)
+
+
+def construir_recursos(carpeta_origen: Path = Path("assets/img")) -> List[Path]:
+    """Genera todas las variantes de las imágenes de ``carpeta_origen`` (paso de build)."""
+    rutas = []
+    for origen in sorted(carpeta_origen.glob("*")):
+        if origen.suffix.lower() in (".png", ".jpg", ".jpeg"):
+            rutas.extend(ruta for _, ruta in variantes_imagen(origen))
+    return rutas
+
+
+if __name__ == "__main__":
+    for ruta in construir_recursos():
+        print(f"{ruta.relative_to(STATIC_DIR)}  {ruta.stat().st_size / 1024:8.1f} KB")
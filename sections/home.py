@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from typing import Tuple, List
-import re as _re
+from typing import List, Tuple
 
 import pandas as pd
 import streamlit as st
 
+from agregados import Filtros, filtros_aplicables
+from data_loader import COLUMNA_CODIGO_BC, COLUMNAS_INTERNAS
+from dataset import Dataset
+from exportacion import FORMATOS, exportar, formatos_disponibles, nombre_archivo
 from graficos import (
     plot_mapa_basura_cero_por_departamento,
     plot_top_sectores,
@@ -13,12 +16,20 @@ from graficos import (
     plot_relacion_basura_cero,
     plot_autoridades,
 )
-from utils import render_footer
+from utils import fragmento, imagen_responsiva, render_footer
+
+# Filtros globales + búsqueda de texto: lo que define el "resultado filtrado".
+FiltrosTabla = Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...], str]
 
 
 @st.cache_data(show_spinner=False)
-def resumen_texto(df: pd.DataFrame) -> str:
-    """Genera un breve resumen del subconjunto de datos activo."""
+def resumen_texto(_df: pd.DataFrame, version: str) -> str:
+    """
+    Genera un breve resumen del subconjunto de datos activo.
+
+    La caché se indexa por ``version``; ``_df`` no se hashea.
+    """
+    df = _df
     if df.empty:
         return "No hay datos para mostrar."
     top_dep = df["DEPARTAMENTO"].value_counts().idxmax()
@@ -32,47 +43,11 @@ def resumen_texto(df: pd.DataFrame) -> str:
     )
 
 
-@st.cache_data(show_spinner=False)
-def obtener_opciones_filtros(df: pd.DataFrame) -> Tuple[List[str], List[str], List[str]]:
-    """Lista de opciones únicas para filtros (región, sector, categorías Basura Cero)."""
-    if "REGIÓN" in df.columns:
-        regiones = sorted(
-            region
-            for region in df["REGIÓN"].dropna().unique().tolist()
-            if str(region).strip()
-        )
-    else:
-        regiones = []
-
-    if "SECTOR" in df.columns:
-        sectores = sorted(
-            sector
-            for sector in df["SECTOR"].dropna().unique().tolist()
-            if str(sector).strip()
-        )
-    else:
-        sectores = []
-
-    if "RELACIÓN BASURA CERO" in df.columns:
-        categorias_relacion = sorted(
-            {
-                categoria.strip()
-                for valor in df["RELACIÓN BASURA CERO"].dropna()
-                for categoria in str(valor).split(",")
-                if categoria.strip()
-                and categoria.strip().lower()
-                not in {"no aplica", "no disponible"}
-            }
-        )
-    else:
-        categorias_relacion = []
-
-    return regiones, sectores, categorias_relacion
-
-
-def render_home(df: pd.DataFrame) -> None:
+def render_home(dataset: Dataset) -> None:
     """Renderiza la pantalla principal (Inicio) del dashboard."""
-    # Banner superior usando CSS y fondo en base64
+    df = dataset.frame
+
+    # Banner superior: el fondo lo pone el CSS con el WebP estático (base64 solo como respaldo)
     st.markdown(
         """
         <div class="banner">
@@ -90,7 +65,8 @@ def render_home(df: pd.DataFrame) -> None:
         "Este panel permite explorar información limpia, estandarizada y enriquecida con indicadores "
         "relacionados con la economía circular y el programa **Basura Cero**."
     )
-    st.markdown(resumen_texto(df))
+    st.markdown(resumen_texto(df, dataset.version))
+    columnas_visibles = [col for col in df.columns if col not in COLUMNAS_INTERNAS]
 
     # Métricas principales
     col1, col2, col3 = st.columns(3)
@@ -105,7 +81,7 @@ def render_home(df: pd.DataFrame) -> None:
         st.markdown(
             f"<div class='metric-card'><div class='metric-icon'>📊</div>"
             f"<div class='metric-content'><div class='metric-label'>Columnas</div>"
-            f"<div class='metric-value'>{df.shape[1]}</div></div></div>",
+            f"<div class='metric-value'>{len(columnas_visibles)}</div></div></div>",
             unsafe_allow_html=True,
         )
     with col3:
@@ -118,68 +94,148 @@ def render_home(df: pd.DataFrame) -> None:
 
     st.markdown("---")
     st.subheader("Mapa de proyectos emblemáticos del programa Basura Cero")
-    st.image(
+    imagen_responsiva(
         "assets/img/mapa_basura_cero.jpg",
         caption="Fuente: Datos abiertos del Gobierno de Colombia (SSPD y MinVivienda, 2023–2024).",
-        use_container_width=True,
+        alt="Mapa de proyectos emblemáticos del programa Basura Cero en Colombia",
     )
 
-    # Visualizaciones principales
-    plot_mapa_basura_cero_por_departamento(df)
-    plot_top_sectores(df)
-    plot_tendencia_anual(df)
-    plot_relacion_basura_cero(df)
-    plot_autoridades(df)
-
-    # Tabla detallada con filtros
-    regiones_op, sectores_op, categorias_relacion_op = obtener_opciones_filtros(df)
-    if not df.empty:
-        with st.expander("📊 Ver Listado_de_Negocios_Verdes"):
-            st.caption(
-                "La descarga incluye la base completa normalizada, independientemente de los filtros aplicados."
-            )
-            csv_full = df.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                label="📥 Descargar Base de Datos en CSV",
-                data=csv_full,
-                file_name="negocios_verdes_normalizados.csv",
-                mime="text/csv",
-            )
-            filtered_df = df.copy()
-
-            if "REGIÓN" in df.columns and regiones_op:
-                seleccion_regiones = st.multiselect(
-                    "Selecciona regiones",
-                    regiones_op,
-                    help="Elige una o más regiones para focalizar la vista de la tabla.",
-                )
-                if seleccion_regiones:
-                    filtered_df = filtered_df[filtered_df["REGIÓN"].isin(seleccion_regiones)]
-
-            if "SECTOR" in df.columns and sectores_op:
-                seleccion_sectores = st.multiselect(
-                    "Selecciona sectores",
-                    sectores_op,
-                    help="Delimita la tabla a los sectores de tu interés.",
-                )
-                if seleccion_sectores:
-                    filtered_df = filtered_df[filtered_df["SECTOR"].isin(seleccion_sectores)]
-
-            if "RELACIÓN BASURA CERO" in df.columns and categorias_relacion_op:
-                seleccion_relacion = st.multiselect(
-                    "Categorías Basura Cero",
-                    categorias_relacion_op,
-                    help=(
-                        "Filtra iniciativas que mencionen explícitamente las categorías asociadas al programa Basura Cero."
-                    ),
-                )
-                if seleccion_relacion:
-                    patron = "|".join(_re.escape(cat) for cat in seleccion_relacion)
-                    series_rel = filtered_df["RELACIÓN BASURA CERO"].fillna("").astype(str)
-                    mask_relacion = series_rel.str.contains(patron, regex=True)
-                    filtered_df = filtered_df[mask_relacion]
-
-            st.dataframe(filtered_df, use_container_width=True)
+    # Filtros globales, visualizaciones principales y tabla detallada
+    panel_filtrado(dataset, columnas_visibles)
 
     # Banner inferior de cierre + autores
     render_footer()
+
+
+def selector_filtros(dataset: Dataset) -> Filtros:
+    """Filtros globales por región, sector y categoría Basura Cero."""
+    df = dataset.frame
+    regiones_op, sectores_op, categorias_relacion_op = dataset.opciones_filtros
+    seleccion_regiones: List[str] = []
+    seleccion_sectores: List[str] = []
+    seleccion_relacion: List[str] = []
+
+    if "REGIÓN" in df.columns and regiones_op:
+        seleccion_regiones = st.multiselect(
+            "Selecciona regiones",
+            regiones_op,
+            help="Elige una o más regiones para focalizar los gráficos y la tabla.",
+        )
+
+    if "SECTOR" in df.columns and sectores_op:
+        seleccion_sectores = st.multiselect(
+            "Selecciona sectores",
+            sectores_op,
+            help="Delimita los gráficos y la tabla a los sectores de tu interés.",
+        )
+
+    if COLUMNA_CODIGO_BC in df.columns and categorias_relacion_op:
+        seleccion_relacion = st.multiselect(
+            "Categorías Basura Cero",
+            categorias_relacion_op,
+            help=(
+                "Filtra iniciativas que mencionen explícitamente las categorías asociadas al programa Basura Cero."
+            ),
+        )
+
+    return Filtros(tuple(seleccion_regiones), tuple(seleccion_sectores), tuple(seleccion_relacion))
+
+
+@fragmento
+def panel_filtrado(dataset: Dataset, columnas_visibles: List[str]) -> None:
+    """Filtros globales, gráficos y tabla; un cambio de filtro solo vuelve a ejecutar esto."""
+    st.markdown("### 🔎 Filtros")
+    st.caption(
+        "Los filtros se aplican a todos los gráficos y a la tabla. Cada gráfico ignora el filtro de su "
+        "propia dimensión (p. ej. el de sectores sigue mostrando todos los sectores) para poder comparar."
+    )
+    filtros = selector_filtros(dataset)
+    if any(filtros) and dataset.cubo_filtrado(filtros).empty:
+        st.info("No hay registros con los filtros seleccionados.")
+
+    def clave(nombre: str) -> Tuple:
+        """Clave de la caché de figuras: la figura solo depende de la versión y de sus filtros."""
+        return (dataset.version, filtros_aplicables(nombre, filtros))
+
+    # Todos los agregados listos (calculados a la vez) antes de dibujar en orden.
+    agregados = dataset.agregados_filtrados(filtros)
+    plot_mapa_basura_cero_por_departamento(agregados["mapa"], clave=clave("mapa"))
+    plot_top_sectores(agregados["top_sectores"], clave=clave("top_sectores"))
+    plot_tendencia_anual(agregados["tendencia"], clave=clave("tendencia"))
+    plot_relacion_basura_cero(agregados["relacion"], agregados["categorias"], clave=clave("relacion"))
+    plot_autoridades(agregados["autoridades"], clave=clave("autoridades"))
+
+    if not dataset.frame.empty:
+        with st.expander("📊 Ver Listado_de_Negocios_Verdes"):
+            tabla_filtrada(dataset, filtros, columnas_visibles)
+
+
+@fragmento
+def tabla_filtrada(dataset: Dataset, filtros: Filtros, columnas_visibles: List[str]) -> None:
+    """Búsqueda, tabla filtrada y descarga; buscar solo vuelve a ejecutar esto."""
+    df = dataset.frame
+    consulta = st.text_input(
+        "Buscar en el listado",
+        placeholder="Ej.: miel, reciclaje, café orgánico",
+        help="Busca en la descripción, el producto principal y el nombre del negocio (sin distinguir tildes ni mayúsculas).",
+    )
+    coincidencias = dataset.busqueda.mascara(consulta) if consulta.strip() else None
+
+    # Filtrado con el índice de bitmaps: sin copias intermedias, un solo take.
+    filtered_df = dataset.indice.filtrar(
+        df,
+        regiones=filtros.regiones,
+        sectores=filtros.sectores,
+        categorias=filtros.categorias,
+        adicional=coincidencias,
+    )
+
+    st.dataframe(filtered_df, use_container_width=True, column_order=columnas_visibles)
+    descarga(
+        dataset,
+        filtered_df,
+        columnas_visibles,
+        (*filtros, consulta.strip()),
+    )
+
+
+@fragmento
+def descarga(
+    dataset: Dataset, filtered_df: pd.DataFrame, columnas_visibles: List[str], filtros_tabla: FiltrosTabla
+) -> None:
+    """Opciones de descarga: elegir formato o alcance no vuelve a filtrar la tabla."""
+    # Descarga bajo demanda: no se serializa nada hasta pulsar "Preparar descarga".
+    col_alcance, col_formato = st.columns(2)
+    alcance = col_alcance.radio(
+        "Datos a descargar",
+        ["Base completa", "Resultado filtrado"],
+        horizontal=True,
+        help="La base completa ignora los filtros; el resultado filtrado descarga solo lo que ves en la tabla.",
+    )
+    formato = col_formato.selectbox(
+        "Formato",
+        formatos_disponibles(),
+        format_func=lambda clave: FORMATOS[clave].etiqueta,
+    )
+    filtrado = alcance == "Resultado filtrado"
+    filtros = filtros_tabla if filtrado else ()
+    solicitud = (dataset.version, formato, filtros)
+    if st.button("Preparar descarga"):
+        st.session_state["descarga_solicitada"] = solicitud
+    if st.session_state.get("descarga_solicitada") == solicitud:
+        datos = exportar(
+            filtered_df if filtrado else dataset.frame,
+            dataset.version,
+            formato,
+            tuple(columnas_visibles),
+            filtros,
+        )
+        st.download_button(
+            label=f"📥 Descargar {FORMATOS[formato].etiqueta}",
+            data=datos,
+            file_name=nombre_archivo(
+                "negocios_verdes_filtrados" if filtrado else "negocios_verdes_normalizados", formato
+            ),
+            mime=FORMATOS[formato].mime,
+            on_click="ignore",
+        )
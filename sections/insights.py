@@ -36,11 +36,12 @@ def insight_card(title, value, description, icon="📌", color="#E8F5E9"):
 #   🌱 FUNCIÓN PRINCIPAL — SIN GRÁFICOS
 # ============================================================
 
-def render_insights(df):
+def render_insights(dataset):
     """
     Renderiza la sección de Insights sin gráficos,
     usando tarjetas premium, texto y storytelling.
     """
+    df = dataset.frame
 
     st.title("🔍 Insights del Análisis de Negocios Verdes")
 
@@ -98,7 +99,7 @@ def render_insights(df):
     # INSIGHT 3 – LA MIEL COMO PRODUCTO DESTACADO
     # ============================================================
 
-    productos_miel = df["DESCRIPCIÓN"].str.contains("miel", case=False, na=False).sum()
+    productos_miel = dataset.busqueda.contar("miel", campos=["DESCRIPCIÓN"])
     porcentaje_miel = round((productos_miel / len(df)) * 100, 2)
 
     insight_card(
@@ -119,8 +120,7 @@ def render_insights(df):
     # INSIGHT 4 – BRECHA EN ENERGÍAS RENOVABLES
     # ============================================================
 
-    energias = df[df["SECTOR"].str.contains("energ", case=False, na=False)]
-    cant_energias = len(energias)
+    cant_energias = dataset.busqueda.contar("energ", campos=["SECTOR"])
     porcentaje_energias = round((cant_energias / len(df)) * 100, 2)
 
     insight_card(
@@ -0,0 +1,259 @@
+"""
+Instantánea local del dataset limpio (Arrow/Feather + manifiesto JSON).
+
+Permite que los arranques en frío lean el resultado de la limpieza desde disco
+y solo vuelvan a descargar/procesar el CSV cuando la fuente cambió.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import hashlib
+import json
+import os
+import tempfile
+import urllib.request
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from dictionaries import DEPARTMENT_CANONICAL, DEPARTMENT_COORDS, MAPEO_REGION, categorias_basura_cero
+
+ARCHIVO_MANIFIESTO = "manifest.json"
+
+# Tablas que componen una instantánea completa (cada una en "<nombre>.feather").
+TABLA_DATOS = "dataset"
+TABLA_CUBO = "cubo"
+TABLAS = (TABLA_DATOS, TABLA_CUBO)
+# Opcional: huella de cada fila cruda de la fuente, para reprocesar solo los cambios.
+TABLA_HUELLAS = "huellas"
+
+# Cada instantánea se escribe tabla por tabla; el manifiesto (escrito al final) guarda
+# filas, tamaño y SHA-256 de cada una para detectar conjuntos mezclados de dos escrituras.
+CLAVE_TABLAS = "tablas"
+
+# Incrementar cuando cambie la lógica de limpieza para invalidar instantáneas viejas.
+VERSION_PIPELINE = 4
+
+
+def _huella_reglas() -> str:
+    """
+    Hash de los diccionarios que usa la limpieza (en su orden: el de las categorías
+    Basura Cero define los bits del código). Cambiarlos invalida las instantáneas y
+    los artefactos sin tener que incrementar ``VERSION_PIPELINE``.
+    """
+    reglas = {
+        "DEPARTMENT_CANONICAL": DEPARTMENT_CANONICAL,
+        "DEPARTMENT_COORDS": DEPARTMENT_COORDS,
+        "MAPEO_REGION": MAPEO_REGION,
+        "categorias_basura_cero": categorias_basura_cero,
+    }
+    return hashlib.sha256(json.dumps(reglas, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+HUELLA_REGLAS = _huella_reglas()
+
+
+class SnapshotInconsistente(ValueError):
+    """Una tabla de la instantánea no es la que describe el manifiesto."""
+
+
+def es_url(origen: str) -> bool:
+    """Indica si el origen es una URL remota (y no una ruta local)."""
+    return str(origen).startswith(("http://", "https://"))
+
+
+def firma_fuente(origen: str, timeout: float = 10.0) -> Dict[str, Any]:
+    """Obtiene ETag, tamaño y fecha de modificación de la fuente sin descargarla."""
+    if es_url(origen):
+        peticion = urllib.request.Request(origen, method="HEAD")
+        with urllib.request.urlopen(peticion, timeout=timeout) as respuesta:
+            tamano = respuesta.headers.get("Content-Length")
+            return {
+                "etag": respuesta.headers.get("ETag"),
+                "tamano": int(tamano) if tamano else None,
+                "modificado": respuesta.headers.get("Last-Modified"),
+            }
+    info = os.stat(origen)
+    return {"etag": None, "tamano": info.st_size, "modificado": info.st_mtime_ns}
+
+
+def firmas_coinciden(previa: Optional[Dict[str, Any]], actual: Dict[str, Any]) -> bool:
+    """Compara dos firmas: primero por ETag y, si no hay, por tamaño + modificación."""
+    if not previa:
+        return False
+    if previa.get("etag") and actual.get("etag"):
+        return previa["etag"] == actual["etag"]
+    return (
+        previa.get("tamano") is not None
+        and previa.get("tamano") == actual.get("tamano")
+        and previa.get("modificado") == actual.get("modificado")
+    )
+
+
+def leer_fuente(origen: str, timeout: float = 60.0) -> bytes:
+    """Descarga (o lee de disco) el contenido crudo del CSV."""
+    if es_url(origen):
+        with urllib.request.urlopen(origen, timeout=timeout) as respuesta:
+            return respuesta.read()
+    with open(origen, "rb") as f:
+        return f.read()
+
+
+def hash_contenido(contenido: bytes) -> str:
+    """Hash SHA-256 del contenido crudo de la fuente."""
+    return hashlib.sha256(contenido).hexdigest()
+
+
+def leer_manifiesto(carpeta: Path) -> Optional[Dict[str, Any]]:
+    """Lee el manifiesto de la instantánea; None si no existe o es inválido."""
+    ruta = Path(carpeta) / ARCHIVO_MANIFIESTO
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            manifiesto = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if manifiesto.get("version_pipeline") != VERSION_PIPELINE or manifiesto.get("reglas") != HUELLA_REGLAS:
+        return None
+    descritas = manifiesto.get(CLAVE_TABLAS) or {}
+    if not all(nombre in descritas for nombre in TABLAS):
+        return None
+    # Chequeo barato (sin leer las tablas); ``leer_snapshot`` verifica además el hash.
+    for nombre, descripcion in descritas.items():
+        ruta = _ruta_tabla(carpeta, nombre)
+        if not ruta.exists() or ruta.stat().st_size != descripcion["bytes"]:
+            return None
+    return manifiesto
+
+
+def _escribir_atomico(ruta: Path, escribir) -> None:
+    """Escribe en un archivo temporal y lo renombra para no dejar archivos a medias."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=ruta.parent, prefix=f".{ruta.name}.")
+    os.close(fd)
+    os.chmod(temporal, 0o644)  # mkstemp crea el archivo solo legible por su dueño
+    try:
+        escribir(temporal)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def guardar_manifiesto(carpeta: Path, manifiesto: Dict[str, Any]) -> None:
+    """Guarda el manifiesto JSON de la instantánea."""
+    manifiesto = {**manifiesto, "version_pipeline": VERSION_PIPELINE, "reglas": HUELLA_REGLAS}
+
+    def escribir(ruta: str) -> None:
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+
+    _escribir_atomico(Path(carpeta) / ARCHIVO_MANIFIESTO, escribir)
+
+
+def _ruta_tabla(carpeta: Path, nombre: str) -> Path:
+    return Path(carpeta) / f"{nombre}.feather"
+
+
+def _hash_archivo(ruta: Path, bloque: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for parte in iter(lambda: f.read(bloque), b""):
+            digest.update(parte)
+    return digest.hexdigest()
+
+
+def guardar_snapshot(
+    carpeta: Path,
+    tablas: Dict[str, pd.DataFrame],
+    manifiesto: Dict[str, Any],
+    compresion: str = "lz4",
+) -> bool:
+    """
+    Persiste las tablas (dataset limpio, cubo de agregados) y su manifiesto.
+
+    Con ``compresion="uncompressed"`` las tablas se pueden leer con ``memory_map``
+    sin descomprimirlas en memoria (ver ``leer_snapshot``).
+
+    El manifiesto se escribe al final con las filas, el tamaño y el hash de cada
+    tabla: si el proceso se corta a mitad de camino, ``leer_snapshot`` detecta las
+    tablas que no corresponden al manifiesto vigente.
+
+    Devuelve False si alguna tabla no se puede representar en Arrow (p. ej. columnas
+    con tipos mezclados); en ese caso la app sigue funcionando sin instantánea.
+    """
+    descritas: Dict[str, Dict[str, Any]] = {}
+
+    def escribir(ruta: str, nombre: str, tabla: pd.DataFrame) -> None:
+        tabla.reset_index(drop=True).to_feather(ruta, compression=compresion)
+        descritas[nombre] = {
+            "filas": len(tabla),
+            "bytes": os.path.getsize(ruta),
+            "sha256": _hash_archivo(ruta),
+        }
+
+    try:
+        for nombre, tabla in tablas.items():
+            _escribir_atomico(
+                _ruta_tabla(carpeta, nombre),
+                lambda ruta, nombre=nombre, tabla=tabla: escribir(ruta, nombre, tabla),
+            )
+    except (TypeError, ValueError, ImportError, OSError):
+        return False
+    guardar_manifiesto(carpeta, {**manifiesto, CLAVE_TABLAS: descritas})
+    return True
+
+
+def leer_tabla(
+    carpeta: Path,
+    nombre: str,
+    memory_map: bool = False,
+    manifiesto: Optional[Dict[str, Any]] = None,
+) -> pa.Table:
+    """
+    Tabla de Arrow guardada en la instantánea, sin convertirla a pandas.
+
+    Con ``manifiesto`` se comprueba que la tabla sea la que este describe (filas,
+    tamaño y, si no se mapea en memoria, el SHA-256 del archivo); si no lo es, lanza
+    ``SnapshotInconsistente``.
+    """
+    ruta = _ruta_tabla(carpeta, nombre)
+    esperada = None
+    if manifiesto is not None:
+        esperada = manifiesto.get(CLAVE_TABLAS, {}).get(nombre)
+        if esperada is None or ruta.stat().st_size != esperada["bytes"]:
+            raise SnapshotInconsistente(f"La tabla {nombre!r} no corresponde al manifiesto")
+    if memory_map:
+        tabla = feather.read_table(ruta, memory_map=True)
+    else:
+        contenido = ruta.read_bytes()
+        if esperada is not None and hashlib.sha256(contenido).hexdigest() != esperada["sha256"]:
+            raise SnapshotInconsistente(f"La tabla {nombre!r} no corresponde al manifiesto")
+        tabla = feather.read_table(pa.BufferReader(contenido))
+    if esperada is not None and tabla.num_rows != esperada["filas"]:
+        raise SnapshotInconsistente(f"La tabla {nombre!r} no corresponde al manifiesto")
+    return tabla
+
+
+def leer_snapshot(
+    carpeta: Path,
+    nombre: str = TABLA_DATOS,
+    memory_map: bool = False,
+    manifiesto: Optional[Dict[str, Any]] = None,
+) -> pd.DataFrame:
+    """
+    Carga una tabla guardada en la instantánea (por defecto el dataset limpio).
+
+    Con ``memory_map`` el archivo se mapea en memoria en lugar de leerse: las
+    columnas de texto (Arrow) quedan respaldadas por el mapa, compartido entre
+    procesos por el sistema operativo. Solo conviene con tablas sin comprimir.
+    ``manifiesto`` verifica la tabla como en ``leer_tabla``.
+    """
+    tabla = leer_tabla(carpeta, nombre, memory_map, manifiesto)
+    if memory_map:
+        return tabla.to_pandas(split_blocks=True)
+    return tabla.to_pandas()
@@ -18,9 +18,6 @@ if (Test-Path $venvPath) {
     exit
 }
 
-Write-Host "Limpiando cache de Streamlit..."
-streamlit cache clear
-
 Write-Host "Lanzando aplicación Streamlit..."
 streamlit run main.py
 
@@ -1,41 +1,220 @@
 from __future__ import annotations
 
-from typing import Optional
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import html
+import os
 
-import base64
 import streamlit as st
+from PIL import Image
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from instrumentacion import REGISTRO, etapa
+from recursos import servicio_estatico_activo, srcset, url_estatica, url_imagen, variantes_imagen
+
+
+# Marcador en assets/styles.css -> imagen original.
+BANNERS = {
+    "BANNER_SUPERIOR_URL": "assets/img/verde2.png",
+    "BANNER_INFERIOR_URL": "assets/img/verde.png",
+}
+# Ancho del derivado de los banners (el contenedor mide como máximo 1000 px).
+ANCHO_BANNER = 1024
+CSS_PATH = "assets/styles.css"
+
+
+def _firma_recursos() -> Tuple[Tuple[str, Optional[int]], ...]:
+    """Fechas de modificación del CSS y de los banners (clave de la caché del CSS)."""
+    firma = []
+    for ruta in (CSS_PATH, *BANNERS.values()):
+        try:
+            firma.append((ruta, os.stat(ruta).st_mtime_ns))
+        except FileNotFoundError:
+            firma.append((ruta, None))
+    return tuple(firma)
 
 
-def img_to_base64(path: str) -> Optional[str]:
-    """Convierte una imagen en base64 para usarla en CSS."""
+@st.cache_resource(show_spinner=False, max_entries=4)
+def css_renderizado(firma: Tuple[Tuple[str, Optional[int]], ...], estatico: bool) -> Optional[str]:
+    """
+    CSS con los banners ya resueltos, una vez por combinación de archivos.
+
+    Los banners se sirven como WebP estáticos; sin servicio estático se embeben en base64.
+    """
     try:
-        with open(path, "rb") as f:
-            return base64.b64encode(f.read()).decode("utf-8")
+        with open(CSS_PATH, "r", encoding="utf-8") as f:
+            css = f.read()
     except FileNotFoundError:
-        st.warning(f"No se encontró la imagen: {path}")
         return None
 
+    for marcador, ruta in BANNERS.items():
+        try:
+            url = url_imagen(Path(ruta), ANCHO_BANNER, estatico)
+        except FileNotFoundError:
+            url = ""
+        css = css.replace(marcador, url)
+    return css
+
 
 def load_css() -> None:
     """
-    Carga el archivo assets/styles.css, inyecta los banners en base64
+    Carga el archivo assets/styles.css con los banners ya optimizados
     y aplica el CSS a la app.
     """
-    css_path = "assets/styles.css"
+    firma = _firma_recursos()
+    css = css_renderizado(firma, servicio_estatico_activo())
+    if css is None:
+        st.warning("No se encontró assets/styles.css. Verifica la ruta.")
+        return
+    for ruta, modificado in firma[1:]:
+        if modificado is None:
+            st.warning(f"No se encontró la imagen: {ruta}")
+
+    st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+
+
+# Ancho que ocupa una imagen a todo el contenedor (layout "centered", máx. 1000 px).
+TAMANOS_CONTENEDOR = "(max-width: 1040px) 100vw, 1000px"
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def html_imagen_responsiva(ruta: str, modificado: int, caption: str, alt: str) -> str:
+    """
+    ``<figure>`` con ``srcset`` de las variantes WebP de ``ruta``.
+
+    ``modificado`` (mtime) forma parte de la clave para regenerar si la imagen cambia.
+    """
+    variantes = variantes_imagen(Path(ruta))
+    ancho, mayor = variantes[-1]
+    with Image.open(mayor) as imagen:
+        alto = imagen.height
+    predeterminada = variantes[len(variantes) // 2][1]
+    leyenda = f"<figcaption>{html.escape(caption)}</figcaption>" if caption else ""
+    return (
+        '<figure class="imagen-responsiva">'
+        f'<img src="{url_estatica(predeterminada)}" srcset="{srcset(variantes)}" '
+        f'sizes="{TAMANOS_CONTENEDOR}" width="{ancho}" height="{alto}" '
+        f'alt="{html.escape(alt or caption)}" loading="lazy" decoding="async">'
+        f"{leyenda}</figure>"
+    )
+
+
+def imagen_responsiva(ruta: str, caption: str = "", alt: str = "") -> None:
+    """
+    Muestra una imagen de ``assets/`` a todo el ancho eligiendo la variante adecuada.
+
+    Sin servicio estático (o si no se pueden generar las variantes) usa ``st.image``.
+    """
     try:
-        with open(css_path, "r", encoding="utf-8") as f:
-            css = f.read()
+        modificado = os.stat(ruta).st_mtime_ns
     except FileNotFoundError:
-        st.warning("No se encontró assets/styles.css. Verifica la ruta.")
+        st.warning(f"No se encontró la imagen: {ruta}")
         return
 
-    banner_sup = img_to_base64("assets/img/verde2.png") or ""
-    banner_inf = img_to_base64("assets/img/verde.png") or ""
+    if servicio_estatico_activo():
+        try:
+            st.markdown(html_imagen_responsiva(ruta, modificado, caption, alt), unsafe_allow_html=True)
+            return
+        except OSError:
+            pass
+    st.image(ruta, caption=caption or None, use_container_width=True)
 
-    css = css.replace("BANNER_SUPERIOR_BASE64", banner_sup)
-    css = css.replace("BANNER_INFERIOR_BASE64", banner_inf)
 
-    st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+# Interacciones recientes (con sus componentes ejecutados) que se guardan por sesión.
+INTERACCIONES_GUARDADAS = 10
+
+
+def nueva_interaccion() -> None:
+    """Empieza el conteo de componentes de una interacción (rerun completo o de un fragmento)."""
+    interacciones: List[Dict[str, int]] = st.session_state.setdefault("_interacciones", [])
+    interacciones.append({})
+    del interacciones[:-INTERACCIONES_GUARDADAS]
+
+
+def contar_ejecucion(componente: str) -> None:
+    """Suma una ejecución de ``componente`` a la interacción en curso."""
+    if not st.session_state.get("_interacciones"):
+        nueva_interaccion()
+    actual = st.session_state["_interacciones"][-1]
+    actual[componente] = actual.get(componente, 0) + 1
+
+
+def fragmento(funcion: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    ``st.fragment`` que además cuenta sus ejecuciones por interacción.
+
+    Un widget dentro del fragmento vuelve a ejecutar solo ese fragmento (y los
+    anidados en él), no toda la página.
+    """
+
+    @wraps(funcion)
+    def envoltura(*args: Any, **kwargs: Any) -> Any:
+        # Campos internos de ScriptRunContext (Streamlit >= 1.37): si una versión los
+        # cambia, los reruns de fragmentos se cuentan dentro de la interacción anterior.
+        ctx = get_script_run_ctx()
+        ids_rerun = getattr(ctx, "fragment_ids_this_run", None)
+        if ids_rerun and getattr(ctx, "current_fragment_id", None) in ids_rerun:
+            # Rerun de este fragmento solo: la interacción empieza aquí y no en main.
+            nueva_interaccion()
+        contar_ejecucion(funcion.__name__)
+        with etapa(funcion.__name__, ambito="fragmento"):
+            return funcion(*args, **kwargs)
+
+    return st.fragment(envoltura)
+
+
+def render_panel_depuracion() -> None:
+    """Panel lateral con la última medición de cada etapa (carga, índices, gráficos y secciones)."""
+    with st.sidebar.expander("⏱️ Depuración: tiempos por etapa", expanded=True):
+        mediciones = REGISTRO.ultimas()
+        if not mediciones:
+            st.caption("Todavía no hay mediciones.")
+            return
+        st.dataframe(
+            [
+                {
+                    "Ámbito": m.ambito,
+                    "Etapa": m.nombre,
+                    "ms": round(m.segundos * 1000, 1),
+                    "Filas entrada": m.filas_entrada,
+                    "Filas salida": m.filas_salida,
+                    "Δ memoria (MB)": None if m.memoria_mb is None else round(m.memoria_mb, 1),
+                    "Error": m.error,
+                }
+                for m in mediciones
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        if REGISTRO.archivo is not None:
+            ambitos = ", ".join(sorted(REGISTRO.ambitos))
+            st.caption(f"Historial ({ambitos}) en `{REGISTRO.archivo}` (JSON lines).")
+
+        from cache_figuras import CACHE_FIGURAS  # importa plotly: solo con el panel activo
+
+        figuras = CACHE_FIGURAS.estadisticas()
+        st.caption(
+            f"Caché de figuras: {figuras['figuras']} figuras, {figuras['mb']:.1f} de "
+            f"{figuras['limite_mb']:.0f} MB; {figuras['aciertos']} aciertos y {figuras['fallos']} fallos."
+        )
+
+        # La barra lateral no se redibuja en los reruns de fragmentos: se listan las
+        # interacciones anteriores, incluida esta.
+        st.markdown("**Componentes ejecutados por interacción**")
+        st.dataframe(
+            [
+                {
+                    "Interacción": numero,
+                    "Componentes": sum(componentes.values()),
+                    "Detalle": ", ".join(f"{nombre} ×{veces}" for nombre, veces in componentes.items()),
+                }
+                for numero, componentes in enumerate(st.session_state.get("_interacciones", []), start=1)
+            ][::-1],
+            hide_index=True,
+            use_container_width=True,
+        )
 
 
 def apply_custom_css() -> None: